@@ -1,6 +1,17 @@
 import json
+import math
 import xml.etree.ElementTree as ET
-from typing import List
+from xml.sax.saxutils import escape as xml_escape
+from typing import Dict, List, Optional
+
+try:
+    # быстрый JSON-кодировщик; без него используется стандартный json
+    import orjson
+except ImportError:
+    orjson = None
+
+# размер буфера записи файлов
+WRITE_BUFFER_SIZE = 65536
 
 
 # ИСКЛЮЧЕНИЯ
@@ -18,6 +29,8 @@ class InsufficientStockError(Exception):
 class Product:
     """Класс описывает товар в интернет-магазине"""
 
+    __slots__ = ("id", "name", "category", "price", "stock")
+
     def __init__(self, id: int, name: str, category: str, price: float, stock: int):
         self.id = id
         self.name = name
@@ -33,7 +46,13 @@ class Product:
 
     # объект в словарь (для json и xml)
     def to_dict(self) -> dict:
-        return vars(self)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "category": self.category,
+            "price": self.price,
+            "stock": self.stock,
+        }
 
     # словарь в объект(для json и xml)
     @staticmethod
@@ -44,6 +63,8 @@ class Product:
 class Customer:
     """Класс описывает покупателя в интернет-магазине"""
 
+    __slots__ = ("id", "name", "email", "address")
+
     def __init__(self, id: int, name: str, email: str, address: str):
         self.id = id
         self.name = name
@@ -51,7 +72,7 @@ class Customer:
         self.address = address
 
     def to_dict(self) -> dict:
-        return vars(self)
+        return {"id": self.id, "name": self.name, "email": self.email, "address": self.address}
 
     @staticmethod
     def from_dict(data: dict) -> "Customer":
@@ -61,6 +82,8 @@ class Customer:
 class CartItem:
     """Класс описывает один элемент корзины в интернет-магазине (товар+кол-во)"""
 
+    __slots__ = ("product", "quantity")
+
     def __init__(self, product: Product, quantity: int):
         self.product = product
         self.quantity = quantity
@@ -69,60 +92,78 @@ class CartItem:
         return self.product.price * self.quantity
 
 
+def items_total(items: List[CartItem]) -> float:
+    """Сумма по позициям за один проход, без вызова subtotal() на каждую"""
+    # fsum не накапливает ошибку округления на длинных корзинах
+    return math.fsum(i.product.price * i.quantity for i in items)
+
+
 class ShoppingCart:
     """Класс описывает корзину в интернет-магазине (товар+кол-во)"""
 
     def __init__(self, customer: Customer):
         self.customer = customer
         self.items: List[CartItem] = []
+        # индекс позиций корзины по ID товара
+        self._index: Dict[int, CartItem] = {}
 
     def add_item(self, product: Product, quantity: int) -> None:
-        for item in self.items:
-            if item.product.id == product.id:
-                item.quantity += quantity
-                return
-        self.items.append(CartItem(product, quantity))
+        item = self._index.get(product.id)
+        if item is not None:
+            item.quantity += quantity
+            return
+        item = CartItem(product, quantity)
+        self.items.append(item)
+        self._index[product.id] = item
 
     def remove_item(self, product_id: int) -> None:
-        self.items = [i for i in self.items if i.product.id != product_id]
+        if self._index.pop(product_id, None) is not None:
+            self.items = [i for i in self.items if i.product.id != product_id]
 
     def total_price(self) -> float:
-        return sum(i.subtotal() for i in self.items)
+        return items_total(self.items)
 
 
 class Order:
     """Класс описывает заказ в интернет-магазине"""
-    def __init__(self, id: int, customer: Customer, items: List[CartItem]):
+    def __init__(self, id: int, customer: Customer, items: List[CartItem], total: Optional[float] = None):
         self.id = id
         self.customer = customer
         self.items = items
         self.status = "Создан"
-        self.total = sum(item.subtotal() for item in items)
+        # сумма считается только если не передана готовая (например, из файла)
+        self.total = items_total(items) if total is None else total
 
     def to_dict(self) -> dict:
         return {
             "id": self.id,
             "customer_id": self.customer.id,
-            "items": [{"product_id": i.product.id, "quantity": i.quantity} for i in self.items],
+            # позиции хранятся двумя параллельными списками, без словаря на каждую
+            "product_ids": [i.product.id for i in self.items],
+            "quantities": [i.quantity for i in self.items],
             "status": self.status,
             "total": self.total
         }
 
     @staticmethod
-    def from_dict(data: dict, customers: List[Customer], products: List[Product]) -> "Order":
-        customer = next(c for c in customers if c.id == data["customer_id"])
-        items = []
-        for i in data["items"]:
-            product = next(p for p in products if p.id == i["product_id"])
-            items.append(CartItem(product, i["quantity"]))
-        order = Order(data["id"], customer, items)
+    def from_dict(data: dict, customers_by_id: Dict[int, Customer], products_by_id: Dict[int, Product]) -> "Order":
+        customer = customers_by_id[data["customer_id"]]
+        if "product_ids" in data:
+            pairs = zip(data["product_ids"], data["quantities"])
+        else:
+            # старый формат: список словарей {"product_id", "quantity"}
+            pairs = ((i["product_id"], i["quantity"]) for i in data["items"])
+        items = [CartItem(products_by_id[pid], qty) for pid, qty in pairs]
+        order = Order(data["id"], customer, items, data.get("total"))
         order.status = data.get("status", "Создан")
-        order.total = data.get("total", sum(i.subtotal() for i in items))
         return order
     
 
 class Payment:
     """Информация об оплате"""
+
+    __slots__ = ("order_id", "amount", "method", "status")
+
     def __init__(self, order_id: int, amount: float, method: str, status: str = "Ожидание"):
         self.order_id = order_id
         self.amount = amount
@@ -130,7 +171,12 @@ class Payment:
         self.status = status
 
     def to_dict(self) -> dict:
-        return vars(self)
+        return {
+            "order_id": self.order_id,
+            "amount": self.amount,
+            "method": self.method,
+            "status": self.status,
+        }
     
     @staticmethod
     def from_dict(data: dict) -> "Payment":
@@ -139,13 +185,16 @@ class Payment:
 
 class Delivery:
     """Информация о доставке"""
+
+    __slots__ = ("order_id", "address", "status")
+
     def __init__(self, order_id: int, address: str, status: str = "Не отправлено"):
         self.order_id = order_id
         self.address = address
         self.status = status
 
     def to_dict(self) -> dict:
-        return vars(self)
+        return {"order_id": self.order_id, "address": self.address, "status": self.status}
     
     @staticmethod
     def from_dict(data: dict) -> "Delivery":
@@ -155,6 +204,8 @@ class Delivery:
 class Review:
     """Отзыв покупателя о товаре"""
 
+    __slots__ = ("id", "product_id", "customer_id", "rating", "comment")
+
     def __init__(self, id: int, product_id: int, customer_id: int, rating: int, comment: str):
         self.id = id
         self.product_id = product_id
@@ -163,7 +214,13 @@ class Review:
         self.comment = comment
 
     def to_dict(self) -> dict:
-        return vars(self)
+        return {
+            "id": self.id,
+            "product_id": self.product_id,
+            "customer_id": self.customer_id,
+            "rating": self.rating,
+            "comment": self.comment,
+        }
     
     @staticmethod
     def from_dict(data: dict) -> "Review":
@@ -173,13 +230,15 @@ class Review:
 class Category:
     """Категория товаров"""
 
+    __slots__ = ("id", "name", "description")
+
     def __init__(self, id: int, name: str, description: str = ""):
         self.id = id
         self.name = name
         self.description = description
 
     def to_dict(self) -> dict:
-        return vars(self)
+        return {"id": self.id, "name": self.name, "description": self.description}
 
     @staticmethod
     def from_dict(data: dict) -> "Category":
@@ -199,25 +258,38 @@ class StoreManager:
         self.payments: List[Payment] = []
         self.deliveries: List[Delivery] = []
         self.reviews: List[Review] = []
+        # индексы по ID для быстрого поиска
+        self._products_by_id: Dict[int, Product] = {}
+        self._customers_by_id: Dict[int, Customer] = {}
+
+    def _rebuild_indexes(self) -> None:
+        """Пересобирает индексы товаров и покупателей после загрузки"""
+        self._products_by_id = {p.id: p for p in self.products}
+        self._customers_by_id = {c.id: c for c in self.customers}
 
     # --- CRUD: товары ---
     def add_product(self, product: Product) -> None:
         self.products.append(product)
+        self._products_by_id[product.id] = product
 
     def find_product(self, product_id: int) -> Product:
-        for p in self.products:
-            if p.id == product_id:
-                return p
-        raise ProductNotFoundError(f"Товар с ID {product_id} не найден.")
+        try:
+            return self._products_by_id[product_id]
+        except KeyError:
+            raise ProductNotFoundError(f"Товар с ID {product_id} не найден.") from None
 
     def update_product(self, product_id: int, **kwargs) -> None:
         product = self.find_product(product_id)
         for k, v in kwargs.items():
             if hasattr(product, k):
                 setattr(product, k, v)
+        if product.id != product_id:
+            del self._products_by_id[product_id]
+            self._products_by_id[product.id] = product
 
     def remove_product(self, product_id: int) -> None:
         self.products = [p for p in self.products if p.id != product_id]
+        self._products_by_id.pop(product_id, None)
 
     # --- Категории ---
 
@@ -228,12 +300,13 @@ class StoreManager:
     # --- CRUD: клиенты ---
     def add_customer(self, customer: Customer) -> None:
         self.customers.append(customer)
+        self._customers_by_id[customer.id] = customer
 
     def find_customer(self, customer_id: int) -> Customer:
-        for c in self.customers:
-            if c.id == customer_id:
-                return c
-        raise CustomerNotFoundError(f"Покупатель с ID {customer_id} не найден.")
+        try:
+            return self._customers_by_id[customer_id]
+        except KeyError:
+            raise CustomerNotFoundError(f"Покупатель с ID {customer_id} не найден.") from None
 
     # --- Заказы ---
     def create_order(self, customer_id: int, cart: ShoppingCart) -> Order:
@@ -267,19 +340,26 @@ class StoreManager:
             "deliveries": [d.to_dict() for d in self.deliveries],
             "reviews": [r.to_dict() for r in self.reviews],
         }
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        if orjson is not None:
+            with open(filename, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
 
 
     def load_from_json(self, filename: str) -> None:
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(filename, "rb") as f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
             self.products = [Product.from_dict(p) for p in data.get("products", [])]
             self.customers = [Customer.from_dict(c) for c in data.get("customers", [])]
             self.categories = [Category.from_dict(c) for c in data.get("categories", [])]
-            self.orders = [Order.from_dict(o, self.customers, self.products) for o in data.get("orders", [])]
+            self._rebuild_indexes()
+            self.orders = [Order.from_dict(o, self._customers_by_id, self._products_by_id)
+                           for o in data.get("orders", [])]
             self.payments = [Payment.from_dict(p) for p in data.get("payments", [])]
             self.deliveries = [Delivery.from_dict(d) for d in data.get("deliveries", [])]
             self.reviews = [Review.from_dict(r) for r in data.get("reviews", [])]
@@ -289,43 +369,36 @@ class StoreManager:
 
 
     def save_to_xml(self, filename: str):
-        root = ET.Element("store")
-        for key, items in [("products", self.products),
-                           ("customers", self.customers),
-                           ("categories", self.categories),
-                           ("orders", self.orders),
-                           ("payments", self.payments),
-                           ("deliveries", self.deliveries),
-                           ("reviews", self.reviews)]:
-            section = ET.SubElement(root, key)
-            for item in items:
-                el = ET.SubElement(section, key[:-1])
-                for k, v in item.to_dict().items():
-                    sub = ET.SubElement(el, k)
-                    if isinstance(v, (dict, list)):
-                        sub.text = json.dumps(v, ensure_ascii=False)
-                    else:
-                        sub.text = str(v)
-        tree = ET.ElementTree(root)
-        ET.indent(tree, space="  ", level=0)
-        tree.write(filename, encoding="utf-8", xml_declaration=True)
+        # записи плоские, поэтому XML пишется фрагментами сразу в буфер, без построения дерева
+        with open(filename, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+            f.write("<?xml version='1.0' encoding='utf-8'?>\n<store>\n")
+            for key, items in [("products", self.products),
+                               ("customers", self.customers),
+                               ("categories", self.categories),
+                               ("orders", self.orders),
+                               ("payments", self.payments),
+                               ("deliveries", self.deliveries),
+                               ("reviews", self.reviews)]:
+                if not items:
+                    f.write(f"  <{key} />\n")
+                    continue
+                tag = key[:-1]
+                f.write(f"  <{key}>\n")
+                for item in items:
+                    fields = []
+                    for k, v in item.to_dict().items():
+                        if isinstance(v, list):
+                            # числовые списки (позиции заказа) - через пробел, без JSON внутри
+                            v = " ".join(map(str, v))
+                        text = xml_escape(str(v))
+                        fields.append(f"      <{k}>{text}</{k}>\n" if text else f"      <{k} />\n")
+                    f.write(f"    <{tag}>\n{''.join(fields)}    </{tag}>\n")
+                f.write(f"  </{key}>\n")
+            f.write("</store>")
 
 
     def load_from_xml(self, filename: str):
         try:
-            tree = ET.parse(filename)
-            root = tree.getroot()
-
-            def parse_section(tag):
-                """Извлекает список элементов раздела XML в виде словарей"""
-                items = []
-                section = root.find(tag)
-                if section is not None:
-                    for el in section:
-                        data = {child.tag: child.text for child in el}
-                        items.append(data)
-                return items
-
             def to_int(value):
                 try:
                     return int(value)
@@ -338,78 +411,98 @@ class StoreManager:
                 except (TypeError, ValueError):
                     return value
 
-            # --- Загрузка объектов ---
-            self.products = [
-                Product(
+            def parse_ints(value):
+                return [to_int(x) for x in (value or "").split()]
+
+            def parse_items(value):
+                # старый формат: JSON-строка со списком позиций
+                return json.loads(value or "[]")
+
+            def parse_order(d):
+                order_data = {
+                    "id": to_int(d.get("id")),
+                    "customer_id": to_int(d.get("customer_id")),
+                    "status": d.get("status", "Создан"),
+                    "total": to_float(d.get("total", 0)),
+                }
+                if "product_ids" in d:
+                    order_data["product_ids"] = parse_ints(d["product_ids"])
+                    order_data["quantities"] = parse_ints(d.get("quantities"))
+                else:
+                    order_data["items"] = parse_items(d.get("items"))
+                return order_data
+
+            # --- Сборка объектов из полей записи ---
+            builders = {
+                "products": lambda d: Product(
                     id=to_int(d.get("id")),
                     name=d.get("name", ""),
                     category=d.get("category", ""),
                     price=to_float(d.get("price")),
                     stock=to_int(d.get("stock")),
-                )
-                for d in parse_section("products")
-            ]
-
-            self.customers = [
-                Customer(
+                ),
+                "customers": lambda d: Customer(
                     id=to_int(d.get("id")),
                     name=d.get("name", ""),
                     email=d.get("email", ""),
                     address=d.get("address", ""),
-                )
-                for d in parse_section("customers")
-            ]
-
-            self.categories = [Category.from_dict(d) for d in parse_section("categories")]
-
-            # --- Восстановление заказов ---
-            self.orders = []
-            for d in parse_section("orders"):
-                order_data = {
-                    "id": to_int(d.get("id")),
-                    "customer_id": to_int(d.get("customer_id")),
-                    "items": json.loads(d.get("items", "[]")),
-                    "status": d.get("status", "Создан"),
-                    "total": to_float(d.get("total", 0)),
-                }
-                try:
-                    order = Order.from_dict(order_data, self.customers, self.products)
-                    self.orders.append(order)
-                except StopIteration:
-                    print(f"Ошибка восстановления заказа ID {order_data['id']}: клиент или товар не найден")
-
-            # --- Оплаты ---
-            self.payments = [
-                Payment(
+                ),
+                "categories": Category.from_dict,
+                # заказы ссылаются на клиентов и товары, поэтому собираются после чтения файла
+                "orders": parse_order,
+                "payments": lambda d: Payment(
                     order_id=to_int(d.get("order_id")),
                     amount=to_float(d.get("amount")),
                     method=d.get("method", ""),
                     status=d.get("status", "Ожидание"),
-                )
-                for d in parse_section("payments")
-            ]
-
-            # --- Доставки ---
-            self.deliveries = [
-                Delivery(
+                ),
+                "deliveries": lambda d: Delivery(
                     order_id=to_int(d.get("order_id")),
                     address=d.get("address", ""),
                     status=d.get("status", "Не отправлено"),
-                )
-                for d in parse_section("deliveries")
-            ]
-
-            # --- Отзывы ---
-            self.reviews = [
-                Review(
+                ),
+                "reviews": lambda d: Review(
                     id=to_int(d.get("id")),
                     product_id=to_int(d.get("product_id")),
                     customer_id=to_int(d.get("customer_id")),
                     rating=to_int(d.get("rating")),
                     comment=d.get("comment", ""),
-                )
-                for d in parse_section("reviews")
-            ]
+                ),
+            }
+            sections = {key: [] for key in builders}
+
+            # --- Потоковый разбор: store / раздел / запись / поле ---
+            depth = 0
+            section = None
+            for event, el in ET.iterparse(filename, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == 2:
+                        section = el
+                    continue
+                depth -= 1
+                if depth == 2 and section.tag in sections:
+                    data = {child.tag: child.text for child in el}
+                    sections[section.tag].append(builders[section.tag](data))
+                    # запись разобрана - освобождаем память под её элементы
+                    section.clear()
+
+            self.products = sections["products"]
+            self.customers = sections["customers"]
+            self.categories = sections["categories"]
+            self.payments = sections["payments"]
+            self.deliveries = sections["deliveries"]
+            self.reviews = sections["reviews"]
+            self._rebuild_indexes()
+
+            # --- Восстановление заказов ---
+            self.orders = []
+            for order_data in sections["orders"]:
+                try:
+                    order = Order.from_dict(order_data, self._customers_by_id, self._products_by_id)
+                    self.orders.append(order)
+                except KeyError:
+                    print(f"Ошибка восстановления заказа ID {order_data['id']}: клиент или товар не найден")
 
             print(f"Данные успешно загружены из файла '{filename}'")
 
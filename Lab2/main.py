@@ -9,6 +9,12 @@ import sys
 import requests
 import html as html_lib
 
+try:
+    # быстрый HTML-парсер на C (Lexbor); без него используется регулярный путь
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
 # префикс +7 или 8, затем ровно 10 цифр, между цифрами допускаются пробелы, дефисы, скобки
 PHONE_RE = re.compile(
     r'(?<!\d)'
@@ -18,23 +24,51 @@ PHONE_RE = re.compile(
     r'(?!\d)'
 )
 
-DIGITS_RE = re.compile(r'\D')
+# регулярки для извлечения текста из HTML (запасной путь без selectolax)
+_SCRIPT_RE = re.compile(r'<script.*?>.*?</script>', re.I | re.S)
+_STYLE_RE = re.compile(r'<style.*?>.*?</style>', re.I | re.S)
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.I | re.S)
+_TAG_RE = re.compile(r'<[^>]+>', re.S)
+
+
+class _DigitFilter(dict):
+    """
+    Таблица для str.translate: цифры оставляет, остальные символы удаляет.
+    Заполняется лениво - каждый символ проверяется один раз, дальше это поиск в словаре.
+    """
+
+    def __missing__(self, code: int):
+        value = code if chr(code).isdecimal() else None
+        self[code] = value
+        return value
+
+
+_DIGITS_ONLY = _DigitFilter()
+# байты, которые bytes.translate удаляет из ASCII-совпадений: всё, кроме 0-9
+_NON_DIGIT_BYTES = bytes(c for c in range(256) if not 0x30 <= c <= 0x39)
+
+# размер куска при чтении тела ответа
+_STREAM_CHUNK_SIZE = 65536
 
 
 def find_phone_numbers(text: str, normalize: bool = True) -> list[str]:
     """Ищет номера в тексте. Возвращает нормализованные номера (+7XXXXXXXXXX) по умолчанию."""
-    results = []
-    for m in PHONE_RE.finditer(text):
-        s = m.group(0)
-        digits = DIGITS_RE.sub('', s)
-        if len(digits) == 11 and digits[0] in ('7', '8'):
-            if normalize:
-                if digits[0] == '8':
-                    digits = '7' + digits[1:]
-                results.append('+' + digits)
-            else:
-                results.append(s)
-    return results
+    # любой номер начинается с '+7' или '8': без них регулярку можно не запускать
+    if '8' not in text and '+7' not in text:
+        return []
+    # в шаблоне нет захватывающих групп, поэтому findall сразу отдаёт строки совпадений
+    return _filter_matches(PHONE_RE.findall(text), normalize)
+
+
+def _filter_matches(matches: list[str], normalize: bool = True) -> list[str]:
+    """Отбирает из найденных фрагментов настоящие номера одним проходом по списку."""
+    # ASCII-совпадения (почти все) фильтруются на уровне байтов, остальные - через таблицу
+    digits = [s.encode().translate(None, _NON_DIGIT_BYTES).decode() if s.isascii() else s.translate(_DIGITS_ONLY)
+              for s in matches]
+    if normalize:
+        # ведущие 7 и 8 нормализуются одинаково: одна конкатенация вместо двух
+        return ['+7' + d[1:] for d in digits if len(d) == 11 and d[0] in '78']
+    return [s for s, d in zip(matches, digits) if len(d) == 11 and d[0] in '78']
 
 
 def find_in_file(filename: str) -> list[str]:
@@ -44,37 +78,68 @@ def find_in_file(filename: str) -> list[str]:
     return find_phone_numbers(text)
 
 
+def _strip_tags(html: str) -> str:
+    """
+    Заменяет теги <...> пробелами регуляркой <[^>]+>, но только до последнего '>'.
+    После него тегов нет, а незакрытые '<' в хвосте заставляли бы регулярку
+    просматривать его заново на каждом '<' (квадратичное время). До последнего '>'
+    каждая попытка с '<' либо сразу заканчивается совпадением, либо сразу отклоняется ('<>').
+    """
+    end = html.rfind('>') + 1
+    return _TAG_RE.sub(' ', html[:end]) + html[end:]
+
+
 def _strip_tags_and_scripts(html: str) -> str:
     """
-    Примитивное извлечение видимого текста из HTML:
+    Извлечение видимого текста из HTML:
     - удаляет <script> и <style> блоки,
     - убирает HTML-теги,
     - разворачивает HTML-сущности.
+    При наличии selectolax разбор выполняется одним проходом на C,
+    иначе используется набор регулярных выражений.
     """
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
+        for tag in tree.css('script, style'):
+            tag.decompose()
+        root = tree.body or tree.root
+        text = root.text(separator=' ') if root is not None else ''
+        return ' '.join(text.split())
+    return _strip_tags_and_scripts_re(html)
+
+
+def _strip_tags_and_scripts_re(html: str) -> str:
+    """Извлечение видимого текста из HTML регулярными выражениями."""
     # Убираем скрипты и стили
-    html = re.sub(r'(?is)<script.*?>.*?</script>', ' ', html)
-    html = re.sub(r'(?is)<style.*?>.*?</style>', ' ', html)
+    html = _SCRIPT_RE.sub(' ', html)
+    html = _STYLE_RE.sub(' ', html)
     # Убираем HTML-комментарии
-    html = re.sub(r'(?is)<!--.*?-->', ' ', html)
+    html = _COMMENT_RE.sub(' ', html)
     # Убираем теги
-    text = re.sub(r'(?s)<[^>]+>', ' ', html)
+    text = _strip_tags(html)
     # Разворачиваем сущности и сжимаем пробелы
     text = html_lib.unescape(text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    return ' '.join(text.split())
 
 
 def find_in_webpage(url: str, timeout: int = 10) -> list[str]:
     """
     Загружает страницу по URL, извлекает видимый текст и ищет номера.
+    Тело ответа читается кусками и разбирается целиком: извлечение текста за один
+    проход по всей странице быстрее, чем разбор потока по мере получения.
     В случае ошибки HTTP будет поднято исключение requests.RequestException.
     """
     headers = {
         'User-Agent': 'Mozilla/5.0 (compatible; PhoneFinder/1.0)'
     }
-    resp = requests.get(url, headers=headers, timeout=timeout)
-    resp.raise_for_status()
-    html = resp.text
+    resp = requests.get(url, headers=headers, timeout=timeout, stream=True)
+    try:
+        resp.raise_for_status()
+        if resp.encoding is None:
+            resp.encoding = 'utf-8'
+        html = ''.join(resp.iter_content(chunk_size=_STREAM_CHUNK_SIZE, decode_unicode=True))
+    finally:
+        resp.close()
     text = _strip_tags_and_scripts(html)
     return find_phone_numbers(text)
 
@@ -32,6 +32,10 @@ class TestPhoneFinder(unittest.TestCase):
         text = "номер 1234567890 невалидный"
         self.assertEqual(main.find_phone_numbers(text), [])
 
+    def test_find_phone_numbers_no_prefix(self):
+        text = "телефон 123-456-00-00, код 7 (999) 000-00-00"
+        self.assertEqual(main.find_phone_numbers(text), [])
+
     def test_find_phone_numbers_with_symbols(self):
         text = "мой номер: +7(900)---000--00--00"
         result = main.find_phone_numbers(text)
@@ -63,23 +67,50 @@ class TestPhoneFinder(unittest.TestCase):
 
     # ---------- find_in_webpage ----------
 
-    def test_find_in_webpage(self):
-        html = "<html><body>Наш номер: +7(921)555-55-55</body></html>"
-
+    @staticmethod
+    def _dummy_response(*chunks):
         class DummyResponse:
             status_code = 200
-            text = html
+            encoding = 'utf-8'
             def raise_for_status(self): pass
+            def iter_content(self, chunk_size=1, decode_unicode=False):
+                return iter(chunks)
+            def close(self): pass
+        return DummyResponse()
 
-        def fake_get(url, headers=None, timeout=None):
-            return DummyResponse()
+    def test_find_in_webpage(self):
+        html = "<html><body>Наш номер: +7(921)555-55-55</body></html>"
+
+        def fake_get(url, headers=None, timeout=None, stream=False):
+            return self._dummy_response(html)
 
         with patch('requests.get', fake_get):
             result = main.find_in_webpage("http://example.com")
         self.assertEqual(result, ['+79215555555'])
 
+    def test_find_in_webpage_split_chunks(self):
+        chunks = ["<html><body><script>var t = '8 800 000 00 00';</script>Звоните: 8 (90",
+                  "5) 111-22-33 или +7 99", "9 123 45 67</b", "ody></html>"]
+
+        def fake_get(url, headers=None, timeout=None, stream=False):
+            return self._dummy_response(*chunks)
+
+        with patch('requests.get', fake_get):
+            result = main.find_in_webpage("http://example.com")
+        self.assertEqual(result, ['+79051112233', '+79991234567'])
+
+    def test_find_in_webpage_long_separator_across_chunks(self):
+        chunks = ["<b>8" + " " * 300, "&nbsp;8</b>  8 (905) 111-22-33</b>"]
+
+        def fake_get(url, headers=None, timeout=None, stream=False):
+            return self._dummy_response(*chunks)
+
+        with patch('requests.get', fake_get):
+            result = main.find_in_webpage("http://example.com")
+        self.assertEqual(result, ['+78890511122'])
+
     def test_find_in_webpage_raises(self):
-        def fake_get(url, headers=None, timeout=None):
+        def fake_get(url, headers=None, timeout=None, stream=False):
             raise requests.RequestException("Connection error")
         with patch('requests.get', fake_get):
             with self.assertRaises(requests.RequestException):
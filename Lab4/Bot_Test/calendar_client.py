@@ -1,45 +1,203 @@
 """Клиент для работы с Google Calendar API."""
+import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+from functools import lru_cache
+from typing import ClassVar, Iterator, List, Optional, Dict
 from pathlib import Path
 import json
+import random
+import threading
+import time
 
+import httplib2
+from cachetools import TTLCache
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
 
-from config import Config
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from config import config
 
 logger = logging.getLogger(__name__)
 
+try:
+    # Python 3.9+ имеет встроенный zoneinfo
+    from zoneinfo import ZoneInfo as _TZ_FACTORY
+except ImportError:
+    # Fallback на pytz для старых версий Python
+    from pytz import timezone as _TZ_FACTORY
+
+# Максимальное число запросов в одном пакетном запросе Google API
+GOOGLE_BATCH_LIMIT = 50
+
+# Частичные ответы (fields=): запрашиваем только поля, которые использует бот
+INSERT_FIELDS = 'id,summary,start,end,htmlLink'
+LIST_FIELDS = 'items(id,summary,start,end,htmlLink,description,location),nextPageToken'
+
+# Размер страницы events.list (максимум, который допускает Google)
+LIST_PAGE_SIZE = 2500
+
+# Повтор запросов при временных ошибках Google API (экспоненциальная задержка)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+API_RETRIES = 3
+API_RETRY_BACKOFF_SEC = 0.5
+
+
+@lru_cache(maxsize=512)
+def _parse_iso_datetime(dt_str: str) -> datetime:
+    """
+    Разбирает строку ISO8601 в datetime (результат кэшируется: пользователи часто
+    повторяют одни и те же даты, а datetime неизменяем).
+    """
+    # Z в конце заменяем на +00:00 (fromisoformat до Python 3.11 его не понимает)
+    if dt_str.endswith("Z"):
+        dt_str = dt_str[:-1] + "+00:00"
+    
+    try:
+        return datetime.fromisoformat(dt_str)
+    except ValueError:
+        # Если не получилось, пытаемся другой формат (например, смещение +0300)
+        return datetime.strptime(dt_str, "%Y-%m-%dT%H:%M:%S%z")
+
+
+class _OrjsonModel(JsonModel):
+    """
+    JsonModel, разбирающий тела ответов через orjson.
+    Тела запросов сериализует стандартный JsonModel (json.dumps): названия и описания
+    событий почти всегда кириллические, а тело должно быть ASCII-строкой.
+    """
+    
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return content.decode("utf-8") if isinstance(content, bytes) else content
+        if self._data_wrapper and "data" in body:
+            body = body["data"]
+        return body
+
 
 class CalendarClient:
     """Клиент для взаимодействия с Google Calendar."""
     
+    # OAuth-учетные данные, общие для всех экземпляров клиента
+    _creds: ClassVar[Optional[Credentials]] = None
+    _creds_lock: ClassVar[threading.Lock] = threading.Lock()
+    
     def __init__(self):
-        self.credentials_path = Config.GOOGLE_CREDENTIALS_PATH
-        self.token_path = Config.GOOGLE_TOKEN_PATH
-        self.scopes = Config.GOOGLE_SCOPES
-        self.timezone = Config.TIMEZONE
-        self.default_duration_min = Config.DEFAULT_EVENT_DURATION_MIN
-        self.service = None
-        self._authenticate()
+        self.credentials_path = config.GOOGLE_CREDENTIALS_PATH
+        self.token_path = config.GOOGLE_TOKEN_PATH
+        self.scopes = config.GOOGLE_SCOPES
+        self.timezone = config.TIMEZONE
+        self._tz = _TZ_FACTORY(self.timezone)
+        self.default_duration_min = config.DEFAULT_EVENT_DURATION_MIN
+        self._default_duration = timedelta(minutes=self.default_duration_min)
+        self.events_cache_ttl = config.EVENTS_CACHE_TTL_SEC
+        # Кэш list_events: дата (YYYY-MM-DD) -> список событий; записи устаревают по TTL,
+        # число дат ограничено. TTLCache не потокобезопасен, а клиент вызывается из
+        # потоков asyncio.to_thread, поэтому доступ к нему - под блокировкой
+        self._events_cache: TTLCache = TTLCache(
+            maxsize=config.EVENTS_CACHE_MAXSIZE, ttl=max(self.events_cache_ttl, 0)
+        )
+        self._events_cache_lock = threading.Lock()
+        # Сервис создается при первом обращении к API (см. свойство service)
+        self._service = None
+        self._service_lock = threading.Lock()
+        # httplib2.Http не потокобезопасен, поэтому у каждого потока свое соединение
+        self._local = threading.local()
+    
+    @property
+    def service(self):
+        """Сервис Google Calendar; аутентификация выполняется при первом обращении."""
+        if self._service is None:
+            with self._service_lock:
+                if self._service is None:
+                    self._authenticate()
+        return self._service
     
     def _authenticate(self):
         """Аутентификация в Google Calendar API."""
-        creds = None
+        # Учетные данные общие для всех экземпляров: загрузка и обновление токена - один раз
+        with CalendarClient._creds_lock:
+            creds = self._load_credentials()
         
-        # Проверяем, есть ли сохраненный токен
-        if Path(self.token_path).exists():
+        # Создаем сервис для работы с календарем
+        try:
+            # Документ discovery берется из копии, входящей в google-api-python-client,
+            # без запроса к Google при каждом запуске
+            self._service = build(
+                'calendar', 'v3', http=self._http(),
+                model=_OrjsonModel() if orjson is not None else None,
+                static_discovery=True, cache_discovery=False
+            )
+            logger.info("Успешное подключение к Google Calendar API")
+        except Exception as e:
+            logger.error(f"Ошибка создания сервиса Google Calendar: {e}")
+            raise
+    
+    def _http(self) -> AuthorizedHttp:
+        """
+        Возвращает HTTP-клиент текущего потока.
+        
+        Соединение создается один раз на поток и переиспользуется (keep-alive)
+        вместо TLS-рукопожатия на каждый запрос.
+        """
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(
+                CalendarClient._creds,
+                http=httplib2.Http(timeout=config.GOOGLE_HTTP_TIMEOUT)
+            )
+            self._local.http = http
+        return http
+    
+    def _execute(self, request, idempotent: bool = True):
+        """
+        Выполняет запрос Google API через HTTP-клиент текущего потока.
+        
+        При временных ошибках (429, 5xx) идемпотентный запрос повторяется с экспоненциальной
+        задержкой и случайным разбросом; остальные ошибки пробрасываются сразу.
+        Неидемпотентные запросы (events.insert) не повторяются: Google мог выполнить
+        запрос и вернуть 5xx, и повтор создал бы дубликат события.
+        """
+        attempts = API_RETRIES if idempotent else 1
+        for attempt in range(attempts):
+            try:
+                return request.execute(http=self._http())
+            except HttpError as e:
+                if e.resp.status not in RETRY_STATUSES or attempt == attempts - 1:
+                    raise
+                delay = API_RETRY_BACKOFF_SEC * 2 ** attempt + random.random() * 0.1
+                logger.warning(f"Временная ошибка Google API ({e.resp.status}), повтор через {delay:.2f} с")
+                time.sleep(delay)
+    
+    def _load_credentials(self) -> Credentials:
+        """Возвращает валидные учетные данные, при необходимости обновляя или запрашивая токен."""
+        creds = CalendarClient._creds
+        if creds and creds.valid:
+            return creds
+        
+        # Загружаем сохраненный токен, если он есть (без отдельной проверки exists)
+        if creds is None:
             try:
                 creds = Credentials.from_authorized_user_file(self.token_path, self.scopes)
                 logger.info("Загружен сохраненный токен")
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 logger.warning(f"Ошибка загрузки токена: {e}")
         
+        previous_token = creds.token if creds else None
+        
         # Если нет валидных учетных данных, запрашиваем авторизацию
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
@@ -51,32 +209,28 @@ class CalendarClient:
                     creds = None
             
             if not creds:
-                if not Path(self.credentials_path).exists():
+                try:
+                    flow = InstalledAppFlow.from_client_secrets_file(
+                        self.credentials_path, self.scopes
+                    )
+                except FileNotFoundError:
                     raise FileNotFoundError(
                         f"Файл credentials.json не найден по пути: {self.credentials_path}\n"
                         "Пожалуйста, создайте OAuth 2.0 клиент в Google Cloud Console и скачайте credentials.json"
-                    )
-                
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    self.credentials_path, self.scopes
-                )
+                    ) from None
                 # Используем локальный сервер для OAuth
                 creds = flow.run_local_server(port=0)
                 logger.info("Выполнена новая авторизация")
-            
-            # Сохраняем токен для следующего запуска
+        
+        # Сохраняем токен для следующего запуска, только если он изменился
+        if creds.token != previous_token:
             Path(self.token_path).parent.mkdir(parents=True, exist_ok=True)
             with open(self.token_path, 'w') as token:
                 token.write(creds.to_json())
             logger.info(f"Токен сохранен в {self.token_path}")
         
-        # Создаем сервис для работы с календарем
-        try:
-            self.service = build('calendar', 'v3', credentials=creds)
-            logger.info("Успешное подключение к Google Calendar API")
-        except Exception as e:
-            logger.error(f"Ошибка создания сервиса Google Calendar: {e}")
-            raise
+        CalendarClient._creds = creds
+        return creds
     
     def create_event(
         self,
@@ -102,65 +256,20 @@ class CalendarClient:
             Словарь с данными созданного события или None в случае ошибки
         """
         try:
-            # Парсим дату начала
-            start_dt = self._parse_datetime(start_datetime)
-            
-            # Если дата окончания не указана, добавляем дефолтную длительность
-            if end_datetime:
-                end_dt = self._parse_datetime(end_datetime)
-            else:
-                end_dt = start_dt + timedelta(minutes=self.default_duration_min)
-            
-            # Формируем список участников (attendees)
-            attendees = []
-            if participants:
-                for participant in participants:
-                    # Если это email, добавляем как email, иначе как имя
-                    if "@" in participant:
-                        attendees.append({"email": participant})
-                    else:
-                        # Если нет email, добавляем в описание
-                        if description:
-                            description += f"\nУчастники: {', '.join(participants)}"
-                        else:
-                            description = f"Участники: {', '.join(participants)}"
-            
-            # Формируем тело события
-            event_body = {
-                'summary': title,
-                'start': {
-                    'dateTime': start_dt.isoformat(),
-                    'timeZone': self.timezone,
-                },
-                'end': {
-                    'dateTime': end_dt.isoformat(),
-                    'timeZone': self.timezone,
-                },
-            }
-            
-            if description:
-                event_body['description'] = description
-            
-            if location:
-                event_body['location'] = location
-            
-            if attendees:
-                event_body['attendees'] = attendees
+            event_body = self._build_event_body(
+                title, start_datetime, end_datetime, description, location, participants
+            )
             
             # Создаем событие
-            event = self.service.events().insert(
+            event = self._execute(self.service.events().insert(
                 calendarId='primary',
-                body=event_body
-            ).execute()
+                body=event_body,
+                fields=INSERT_FIELDS
+            ), idempotent=False)
             
             logger.info(f"Создано событие: {title} (ID: {event.get('id')})")
-            return {
-                'id': event.get('id'),
-                'summary': event.get('summary'),
-                'start': event.get('start'),
-                'end': event.get('end'),
-                'htmlLink': event.get('htmlLink')
-            }
+            self._invalidate_events_cache(event_body)
+            return self._event_summary(event)
             
         except HttpError as e:
             logger.error(f"Ошибка Google Calendar API при создании события: {e}")
@@ -169,6 +278,115 @@ class CalendarClient:
             logger.error(f"Неожиданная ошибка при создании события: {e}")
             return None
     
+    def create_events_bulk(self, events: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Создает несколько событий пакетными запросами (до 50 событий в одном HTTP-запросе).
+        
+        Args:
+            events: Список словарей с аргументами create_event
+                (title, start_datetime, end_datetime, description, location, participants)
+            
+        Returns:
+            Список результатов в порядке входных событий; None для событий, которые не удалось создать
+        """
+        results: List[Optional[Dict]] = [None] * len(events)
+        
+        def _collect(request_id, response, exception):
+            if exception is not None:
+                logger.error(f"Ошибка Google Calendar API при пакетном создании события: {exception}")
+                return
+            results[int(request_id)] = self._event_summary(response)
+        
+        for chunk_start in range(0, len(events), GOOGLE_BATCH_LIMIT):
+            batch = self.service.new_batch_http_request(callback=_collect)
+            for i in range(chunk_start, min(chunk_start + GOOGLE_BATCH_LIMIT, len(events))):
+                try:
+                    body = self._build_event_body(**events[i])
+                except Exception as e:
+                    logger.error(f"Некорректные данные события #{i} для пакетного создания: {e}")
+                    continue
+                batch.add(
+                    self.service.events().insert(calendarId='primary', body=body, fields=INSERT_FIELDS),
+                    request_id=str(i)
+                )
+            try:
+                batch.execute(http=self._http())
+            except HttpError as e:
+                logger.error(f"Ошибка Google Calendar API при выполнении пакетного запроса: {e}")
+            except Exception as e:
+                logger.error(f"Неожиданная ошибка при выполнении пакетного запроса: {e}")
+        
+        if any(r is not None for r in results):
+            self._clear_events_cache()
+        
+        created = sum(1 for r in results if r is not None)
+        logger.info(f"Пакетно создано событий: {created} из {len(events)}")
+        return results
+    
+    def _build_event_body(
+        self,
+        title: str,
+        start_datetime: str,
+        end_datetime: Optional[str] = None,
+        description: Optional[str] = None,
+        location: Optional[str] = None,
+        participants: Optional[List[str]] = None
+    ) -> Dict:
+        """Формирует тело запроса events.insert из параметров события."""
+        # Парсим дату начала
+        start_dt = self._parse_datetime(start_datetime)
+        
+        # Если дата окончания не указана, добавляем дефолтную длительность
+        if end_datetime:
+            end_dt = self._parse_datetime(end_datetime)
+        else:
+            end_dt = start_dt + self._default_duration
+        
+        # Формируем список участников: email - в attendees, имена - одной строкой в описание
+        attendees = []
+        if participants:
+            attendees = [{"email": p} for p in participants if "@" in p]
+            names = [p for p in participants if "@" not in p]
+            if names:
+                note = f"Участники: {', '.join(names)}"
+                description = f"{description}\n{note}" if description else note
+        
+        # Формируем тело события
+        timezone = self.timezone
+        event_body = {
+            'summary': title,
+            'start': {
+                'dateTime': start_dt.isoformat(),
+                'timeZone': timezone,
+            },
+            'end': {
+                'dateTime': end_dt.isoformat(),
+                'timeZone': timezone,
+            },
+        }
+        
+        if description:
+            event_body['description'] = description
+        
+        if location:
+            event_body['location'] = location
+        
+        if attendees:
+            event_body['attendees'] = attendees
+        
+        return event_body
+    
+    @staticmethod
+    def _event_summary(event: Dict) -> Dict:
+        """Возвращает основные поля созданного события."""
+        return {
+            'id': event.get('id'),
+            'summary': event.get('summary'),
+            'start': event.get('start'),
+            'end': event.get('end'),
+            'htmlLink': event.get('htmlLink')
+        }
+    
     def list_events(self, date: str) -> List[Dict]:
         """
         Получает список событий на указанную дату.
@@ -179,33 +397,20 @@ class CalendarClient:
         Returns:
             Список событий
         """
+        # Повторные запросы той же даты в течение TTL отдаем из кэша
+        cached = self._get_cached_events(date)
+        if cached is not None:
+            logger.debug(f"События на {date} взяты из кэша")
+            return cached
+        
         try:
-            # Парсим дату
-            date_obj = datetime.strptime(date, "%Y-%m-%d")
-            
-            # Начало дня (00:00:00)
-            time_min = datetime.combine(date_obj.date(), datetime.min.time())
-            time_min = time_min.replace(tzinfo=self._get_timezone())
-            
-            # Конец дня (23:59:59)
-            time_max = datetime.combine(date_obj.date(), datetime.max.time())
-            time_max = time_max.replace(tzinfo=self._get_timezone())
-            # Устанавливаем 23:59:59
-            time_max = time_max.replace(hour=23, minute=59, second=59)
-            
-            # Запрашиваем события
-            events_result = self.service.events().list(
-                calendarId='primary',
-                timeMin=time_min.isoformat(),
-                timeMax=time_max.isoformat(),
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
+            events = list(self.iter_events(date))
             logger.info(f"Найдено {len(events)} событий на {date}")
             
-            return events
+            if self.events_cache_ttl > 0:
+                with self._events_cache_lock:
+                    self._events_cache[date] = events
+            return list(events)
             
         except HttpError as e:
             logger.error(f"Ошибка Google Calendar API при получении событий: {e}")
@@ -214,6 +419,47 @@ class CalendarClient:
             logger.error(f"Неожиданная ошибка при получении событий: {e}")
             return []
     
+    def iter_events(self, date: str) -> Iterator[Dict]:
+        """
+        Постранично получает события на указанную дату и отдает их по мере загрузки.
+        
+        Следующая страница запрашивается, только когда вызывающий код дочитал текущую,
+        поэтому при раннем выходе из цикла лишние страницы не загружаются.
+        Ошибки Google API пробрасываются вызывающему коду.
+        
+        Args:
+            date: Дата в формате YYYY-MM-DD
+            
+        Yields:
+            События в порядке времени начала
+        """
+        # Парсим дату: полночь этого дня
+        day_start = datetime.fromisoformat(date)
+        
+        # Границы дня 00:00:00 - 23:59:59 сразу в нужной временной зоне
+        time_min = day_start.replace(tzinfo=self._tz)
+        time_max = day_start.replace(hour=23, minute=59, second=59, tzinfo=self._tz)
+        
+        list_params = {
+            'calendarId': 'primary',
+            'timeMin': time_min.isoformat(),
+            'timeMax': time_max.isoformat(),
+            'singleEvents': True,
+            'orderBy': 'startTime',
+            'fields': LIST_FIELDS,
+            'maxResults': LIST_PAGE_SIZE,
+        }
+        
+        page_token = None
+        while True:
+            if page_token:
+                list_params['pageToken'] = page_token
+            events_result = self._execute(self.service.events().list(**list_params))
+            yield from events_result.get('items', [])
+            page_token = events_result.get('nextPageToken')
+            if not page_token:
+                break
+    
     def delete_event(self, event_id: str) -> bool:
         """
         Удаляет событие по ID.
@@ -225,12 +471,14 @@ class CalendarClient:
             True если успешно, False в случае ошибки
         """
         try:
-            self.service.events().delete(
+            self._execute(self.service.events().delete(
                 calendarId='primary',
                 eventId=event_id
-            ).execute()
+            ))
             
             logger.info(f"Событие {event_id} удалено")
+            # Дата удаленного события неизвестна, поэтому сбрасываем кэш целиком
+            self._clear_events_cache()
             return True
             
         except HttpError as e:
@@ -240,28 +488,139 @@ class CalendarClient:
             logger.error(f"Неожиданная ошибка при удалении события: {e}")
             return False
     
-    def find_events_by_title_and_date(self, title: str, date: str) -> List[Dict]:
+    def delete_events_bulk(self, event_ids: List[str]) -> List[bool]:
+        """
+        Удаляет несколько событий пакетными запросами (до 50 удалений в одном HTTP-запросе).
+        
+        Args:
+            event_ids: Список ID событий в Google Calendar
+            
+        Returns:
+            Список флагов в порядке входных ID: True если событие удалено
+        """
+        results: List[bool] = [False] * len(event_ids)
+        
+        def _collect(request_id, response, exception):
+            if exception is not None:
+                logger.error(
+                    f"Ошибка Google Calendar API при пакетном удалении события "
+                    f"{event_ids[int(request_id)]}: {exception}"
+                )
+                return
+            results[int(request_id)] = True
+        
+        for chunk_start in range(0, len(event_ids), GOOGLE_BATCH_LIMIT):
+            batch = self.service.new_batch_http_request(callback=_collect)
+            for i in range(chunk_start, min(chunk_start + GOOGLE_BATCH_LIMIT, len(event_ids))):
+                batch.add(
+                    self.service.events().delete(calendarId='primary', eventId=event_ids[i]),
+                    request_id=str(i)
+                )
+            try:
+                batch.execute(http=self._http())
+            except HttpError as e:
+                logger.error(f"Ошибка Google Calendar API при выполнении пакетного запроса: {e}")
+            except Exception as e:
+                logger.error(f"Неожиданная ошибка при выполнении пакетного запроса: {e}")
+        
+        if any(results):
+            self._clear_events_cache()
+        
+        logger.info(f"Пакетно удалено событий: {sum(results)} из {len(event_ids)}")
+        return results
+    
+    def _get_cached_events(self, date: str) -> Optional[List[Dict]]:
+        """Возвращает копию закэшированного списка событий на дату или None, если кэш устарел."""
+        with self._events_cache_lock:
+            cached = self._events_cache.get(date)
+        return list(cached) if cached is not None else None
+    
+    def _clear_events_cache(self) -> None:
+        """Сбрасывает кэш list_events целиком."""
+        with self._events_cache_lock:
+            self._events_cache.clear()
+    
+    def _invalidate_events_cache(self, event_body: Dict) -> None:
+        """Удаляет из кэша list_events все даты, которые затрагивает событие."""
+        start = self._parse_datetime(event_body['start']['dateTime']).astimezone(self._tz).date()
+        end = self._parse_datetime(event_body['end']['dateTime']).astimezone(self._tz).date()
+        day = start
+        with self._events_cache_lock:
+            while day <= end:
+                self._events_cache.pop(day.isoformat(), None)
+                day += timedelta(days=1)
+    
+    def find_events_by_title_and_date(
+        self,
+        title: str,
+        date: str,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
         """
         Находит события по названию и дате.
         
         Args:
             title: Часть названия события
             date: Дата в формате YYYY-MM-DD
+            limit: Максимальное число событий; после него поиск прекращается
             
         Returns:
             Список найденных событий
         """
-        events = self.list_events(date)
+        # Если список дня уже в кэше, фильтруем его; иначе читаем день постранично.
+        # Название ищется как подстрока ("встреч" находит "Встреча с Вадимом")
+        events = self._get_cached_events(date)
+        if events is None:
+            events = self.iter_events(date)
         matching_events = []
         
         title_lower = title.lower()
-        for event in events:
-            event_title = event.get('summary', '').lower()
-            if title_lower in event_title:
-                matching_events.append(event)
+        try:
+            for event in events:
+                event_title = event.get('summary', '').lower()
+                if title_lower in event_title:
+                    matching_events.append(event)
+                    if limit is not None and len(matching_events) >= limit:
+                        break
+        except HttpError as e:
+            logger.error(f"Ошибка Google Calendar API при поиске событий: {e}")
+        except Exception as e:
+            logger.error(f"Неожиданная ошибка при поиске событий: {e}")
         
         return matching_events
     
+    # Асинхронные варианты: блокирующие вызовы Google API выполняются в пуле потоков,
+    # не останавливая цикл событий бота
+    
+    async def acreate_event(self, *args, **kwargs) -> Optional[Dict]:
+        """Асинхронный вариант create_event."""
+        return await asyncio.to_thread(self.create_event, *args, **kwargs)
+    
+    async def acreate_events_bulk(self, events: List[Dict]) -> List[Optional[Dict]]:
+        """Асинхронный вариант create_events_bulk."""
+        return await asyncio.to_thread(self.create_events_bulk, events)
+    
+    async def alist_events(self, date: str) -> List[Dict]:
+        """Асинхронный вариант list_events."""
+        return await asyncio.to_thread(self.list_events, date)
+    
+    async def adelete_event(self, event_id: str) -> bool:
+        """Асинхронный вариант delete_event."""
+        return await asyncio.to_thread(self.delete_event, event_id)
+    
+    async def adelete_events_bulk(self, event_ids: List[str]) -> List[bool]:
+        """Асинхронный вариант delete_events_bulk."""
+        return await asyncio.to_thread(self.delete_events_bulk, event_ids)
+    
+    async def afind_events_by_title_and_date(
+        self,
+        title: str,
+        date: str,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Асинхронный вариант find_events_by_title_and_date."""
+        return await asyncio.to_thread(self.find_events_by_title_and_date, title, date, limit)
+    
     def _parse_datetime(self, dt_str: str) -> datetime:
         """
         Парсит строку даты/времени в объект datetime.
@@ -272,30 +631,10 @@ class CalendarClient:
         Returns:
             Объект datetime с временной зоной
         """
-        # Убираем Z и заменяем на +00:00 если нужно
-        dt_str = dt_str.replace("Z", "+00:00")
-        
-        # Парсим ISO8601
-        try:
-            dt = datetime.fromisoformat(dt_str)
-        except ValueError:
-            # Если не получилось, пытаемся другой формат
-            dt = datetime.strptime(dt_str, "%Y-%m-%dT%H:%M:%S%z")
+        dt = _parse_iso_datetime(dt_str)
         
         # Если нет временной зоны, добавляем московскую
         if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=self._get_timezone())
+            dt = dt.replace(tzinfo=self._tz)
         
         return dt
-    
-    def _get_timezone(self):
-        """Возвращает объект временной зоны."""
-        try:
-            # Python 3.9+ имеет встроенный zoneinfo
-            from zoneinfo import ZoneInfo
-            return ZoneInfo(self.timezone)
-        except ImportError:
-            # Fallback на pytz для старых версий Python
-            import pytz
-            return pytz.timezone(self.timezone)
-
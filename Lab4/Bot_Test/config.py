@@ -1,56 +1,88 @@
 """Конфигурация приложения - загрузка переменных окружения."""
 import os
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Tuple
 from dotenv import load_dotenv
 
-# Загружаем переменные окружения из .env
-load_dotenv()
+# Загружаем переменные окружения из .env рядом с config.py (если он есть).
+# В продакшене окружение уже задано: SKIP_DOTENV=1 отключает чтение файла.
+_DOTENV_PATH = Path(__file__).with_name(".env")
+if os.getenv("SKIP_DOTENV") != "1" and _DOTENV_PATH.is_file():
+    load_dotenv(_DOTENV_PATH, override=False)
 
 
+def _env(name: str, default: str = "", cast=str):
+    """Фабрика значения поля: читает переменную окружения при создании Config."""
+    return field(default_factory=lambda: cast(os.getenv(name, default)))
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Класс для хранения конфигурации приложения."""
+    """Конфигурация приложения (неизменяемая, значения читаются из окружения)."""
     
     # Telegram
-    TELEGRAM_TOKEN: str = os.getenv("TELEGRAM_TOKEN", "")
+    TELEGRAM_TOKEN: str = _env("TELEGRAM_TOKEN")
+    
+    # Таймаут long polling getUpdates (секунды)
+    POLLING_TIMEOUT_SEC: int = _env("POLLING_TIMEOUT_SEC", "30", int)
+    # Сколько обновлений Telegram обрабатывать одновременно (1 - последовательно)
+    CONCURRENT_UPDATES: int = _env("CONCURRENT_UPDATES", "32", int)
+    # HTTP/2 для запросов к Bot API (кроме getUpdates); по умолчанию HTTP/1.1
+    TELEGRAM_HTTP2: bool = _env("TELEGRAM_HTTP2", "0", lambda v: v.lower() in ("1", "true", "yes"))
     
     # Open Router / LLM
-    OPENROUTER_API_KEY: str = os.getenv("OPENROUTER_API_KEY", "")
+    OPENROUTER_API_KEY: str = _env("OPENROUTER_API_KEY")
     OPENROUTER_API_URL: str = "https://openrouter.ai/api/v1/chat/completions"
-    LLM_MODEL: str = os.getenv("LLM_MODEL", "mistralai/mistral-7b-instruct:free")
-    LLM_CONFIDENCE_THRESHOLD: float = float(os.getenv("LLM_CONFIDENCE_THRESHOLD", "0.80"))
+    LLM_MODEL: str = _env("LLM_MODEL", "mistralai/mistral-7b-instruct:free")
+    LLM_CONFIDENCE_THRESHOLD: float = _env("LLM_CONFIDENCE_THRESHOLD", "0.80", float)
+    # Кэш ответов LLM на точно совпадающие сообщения (размер 0 - без кэша)
+    LLM_CACHE_ENABLED: bool = _env("LLM_CACHE_ENABLED", "1", lambda v: v.lower() in ("1", "true", "yes"))
+    LLM_CACHE_SIZE: int = _env("LLM_CACHE_SIZE", "1024", int)
     
     # Google Calendar
-    GOOGLE_CREDENTIALS_PATH: str = os.getenv("GOOGLE_CREDENTIALS_PATH", "./credentials.json")
-    GOOGLE_TOKEN_PATH: str = os.getenv("GOOGLE_TOKEN_PATH", "./token.json")
-    GOOGLE_SCOPES: list = [
+    GOOGLE_CREDENTIALS_PATH: str = _env("GOOGLE_CREDENTIALS_PATH", "./credentials.json")
+    GOOGLE_TOKEN_PATH: str = _env("GOOGLE_TOKEN_PATH", "./token.json")
+    GOOGLE_SCOPES: Tuple[str, ...] = (
         "https://www.googleapis.com/auth/calendar",
         "https://www.googleapis.com/auth/calendar.events"
-    ]
+    )
+    GOOGLE_HTTP_TIMEOUT: int = _env("GOOGLE_HTTP_TIMEOUT", "10", int)
     
     # Временная зона
-    TIMEZONE: str = os.getenv("TIMEZONE", "Europe/Moscow")
-    DEFAULT_EVENT_DURATION_MIN: int = int(os.getenv("DEFAULT_EVENT_DURATION_MIN", "60"))
+    TIMEZONE: str = _env("TIMEZONE", "Europe/Moscow")
+    DEFAULT_EVENT_DURATION_MIN: int = _env("DEFAULT_EVENT_DURATION_MIN", "60", int)
+    # Время жизни кэша списка событий на дату (секунды, 0 - без кэша)
+    EVENTS_CACHE_TTL_SEC: float = _env("EVENTS_CACHE_TTL_SEC", "60", float)
+    # Сколько дат держать в кэше списка событий одновременно
+    EVENTS_CACHE_MAXSIZE: int = _env("EVENTS_CACHE_MAXSIZE", "256", int)
+    
+    # Контекст уточнений: сколько диалогов хранить и через сколько секунд забывать брошенные
+    CLARIFICATION_CONTEXT_MAXSIZE: int = _env("CLARIFICATION_CONTEXT_MAXSIZE", "10000", int)
+    CLARIFICATION_CONTEXT_TTL_SEC: float = _env("CLARIFICATION_CONTEXT_TTL_SEC", "600", float)
     
     # Логирование
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVEL: str = _env("LOG_LEVEL", "INFO")
     
-    @classmethod
-    def validate(cls) -> bool:
+    def validate(self) -> bool:
         """Проверяет наличие обязательных переменных окружения."""
-        if not cls.TELEGRAM_TOKEN or cls.TELEGRAM_TOKEN == "your_telegram_token_here":
+        if not self.TELEGRAM_TOKEN or self.TELEGRAM_TOKEN == "your_telegram_token_here":
             raise ValueError(
                 "TELEGRAM_TOKEN не установлен в .env или имеет значение по умолчанию.\n"
                 "Пожалуйста, создайте файл .env на основе .env.example и заполните реальный токен от @BotFather"
             )
-        if not cls.OPENROUTER_API_KEY or cls.OPENROUTER_API_KEY == "your_openrouter_api_key_here":
+        if not self.OPENROUTER_API_KEY or self.OPENROUTER_API_KEY == "your_openrouter_api_key_here":
             raise ValueError(
                 "OPENROUTER_API_KEY не установлен в .env или имеет значение по умолчанию.\n"
                 "Пожалуйста, получите API ключ на https://openrouter.ai/ и добавьте его в .env"
             )
-        if not Path(cls.GOOGLE_CREDENTIALS_PATH).exists():
+        if not Path(self.GOOGLE_CREDENTIALS_PATH).exists():
             raise FileNotFoundError(
-                f"Файл credentials.json не найден по пути: {cls.GOOGLE_CREDENTIALS_PATH}\n"
+                f"Файл credentials.json не найден по пути: {self.GOOGLE_CREDENTIALS_PATH}\n"
                 "Пожалуйста, создайте OAuth 2.0 клиент в Google Cloud Console и скачайте credentials.json"
             )
         return True
 
+
+# Общий экземпляр конфигурации
+config = Config()
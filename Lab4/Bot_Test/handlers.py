@@ -1,16 +1,51 @@
 """Обработчики сообщений Telegram-бота."""
+import asyncio
 import logging
+import weakref
 from datetime import datetime
+from functools import lru_cache
 from telegram import Update
 from telegram.ext import ContextTypes
+from cachetools import TTLCache
 
 from llm_client import LLMClient
-from calendar_client import CalendarClient
+from calendar_client import CalendarClient, _parse_iso_datetime
 from schema import LLMResponseModel
-from config import Config
+from config import config
 
 logger = logging.getLogger(__name__)
 
+# Ответы пользователя на запрос подтверждения (сравниваются после strip().casefold())
+_YES_ANSWERS = frozenset({"да", "yes", "y", "давай", "ок", "хорошо"})
+_NO_ANSWERS = frozenset({"нет", "no", "n", "не", "неправильно"})
+
+# Описание действия для текста подтверждения
+_INTENT_ACTIONS = {
+    "create": "создать событие",
+    "list": "показать события",
+    "delete": "удалить событие"
+}
+
+
+# Одни и те же даты выводятся несколько раз (подтверждение, затем результат),
+# поэтому отформатированные строки кэшируются
+@lru_cache(maxsize=1024)
+def _format_datetime_for_user(dt_str: str) -> str:
+    """Форматирует дату/время ISO8601 для отображения пользователю."""
+    try:
+        return _parse_iso_datetime(dt_str).strftime("%d.%m.%Y %H:%M")
+    except (TypeError, ValueError):
+        return dt_str
+
+
+@lru_cache(maxsize=1024)
+def _format_date_for_user(date_str: str) -> str:
+    """Форматирует дату YYYY-MM-DD для отображения пользователю."""
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").strftime("%d.%m.%Y")
+    except (TypeError, ValueError):
+        return date_str
+
 
 class MessageHandler:
     """Класс для обработки сообщений пользователя."""
@@ -18,9 +53,21 @@ class MessageHandler:
     def __init__(self):
         self.llm_client = LLMClient()
         self.calendar_client = CalendarClient()
-        self.confidence_threshold = Config.LLM_CONFIDENCE_THRESHOLD
-        # Хранилище для контекста уточнений (user_id -> состояние)
-        self.clarification_context: dict = {}
+        self.confidence_threshold = config.LLM_CONFIDENCE_THRESHOLD
+        # Хранилище для контекста уточнений (user_id -> состояние);
+        # брошенные диалоги вытесняются по TTL, размер ограничен
+        self.clarification_context: TTLCache = TTLCache(
+            maxsize=config.CLARIFICATION_CONTEXT_MAXSIZE,
+            ttl=config.CLARIFICATION_CONTEXT_TTL_SEC
+        )
+        # Блокировки для последовательной обработки сообщений одного пользователя
+        self._user_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+        # Обработчики намерений, которые выполняют действие с календарем
+        self._intent_handlers = {
+            "create": self._handle_create,
+            "list": self._handle_list,
+            "delete": self._handle_delete,
+        }
     
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
@@ -35,13 +82,35 @@ class MessageHandler:
         
         logger.info(f"Получено сообщение от пользователя {user_id}: {user_message}")
         
+        # Обновления разных пользователей обрабатываются параллельно, а сообщения
+        # одного пользователя - по очереди: ответ "да" не должен обогнать вопрос
+        async with self._user_lock(user_id):
+            await self._dispatch_message(update, context, user_id, user_message)
+    
+    def _user_lock(self, user_id: int) -> asyncio.Lock:
+        """Возвращает блокировку пользователя (удаляется сама, когда не используется)."""
+        lock = self._user_locks.get(user_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._user_locks[user_id] = lock
+        return lock
+    
+    async def _dispatch_message(
+        self,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE,
+        user_id: int,
+        user_message: str
+    ) -> None:
+        """Обрабатывает сообщение: продолжает диалог уточнений или отправляет его в LLM."""
         # Проверяем, есть ли активный контекст уточнений
-        if user_id in self.clarification_context:
-            await self._handle_clarification_response(update, context, user_message)
+        context_data = self.clarification_context.get(user_id)
+        if context_data is not None:
+            await self._handle_clarification_response(update, context, user_message, context_data)
             return
         
         # Отправляем сообщение в LLM
-        llm_response = self.llm_client.parse_user_message(user_message)
+        llm_response = await self.llm_client.parse_user_message(user_message)
         
         if not llm_response:
             await update.message.reply_text(
@@ -72,8 +141,7 @@ class MessageHandler:
         # Если нужны уточнения
         if llm_response.clarify.needed and llm_response.clarify.questions:
             self.clarification_context[user_id] = {
-                "intent": llm_response.intent,
-                "slots": llm_response.slots.model_dump(),
+                "llm_response": llm_response,
                 "questions": llm_response.clarify.questions,
                 "current_question_index": 0
             }
@@ -84,9 +152,9 @@ class MessageHandler:
         # Если низкая уверенность, запрашиваем подтверждение
         if llm_response.confidence < self.confidence_threshold:
             confirmation_text = self._format_confirmation(llm_response)
+            # Сохраняем уже провалидированный ответ: после подтверждения он выполняется как есть
             self.clarification_context[user_id] = {
-                "intent": llm_response.intent,
-                "slots": llm_response.slots.model_dump(),
+                "llm_response": llm_response,
                 "waiting_confirmation": True
             }
             await update.message.reply_text(
@@ -95,12 +163,9 @@ class MessageHandler:
             return
         
         # Выполняем действие в зависимости от intent
-        if llm_response.intent == "create":
-            await self._handle_create(update, context, llm_response)
-        elif llm_response.intent == "list":
-            await self._handle_list(update, context, llm_response)
-        elif llm_response.intent == "delete":
-            await self._handle_delete(update, context, llm_response)
+        handler = self._intent_handlers.get(llm_response.intent)
+        if handler is not None:
+            await handler(update, context, llm_response)
         elif llm_response.intent == "unknown":
             await update.message.reply_text(
                 "Извините, я не понял вашу команду. "
@@ -114,7 +179,8 @@ class MessageHandler:
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE,
-        user_message: str
+        user_message: str,
+        context_data: dict
     ) -> None:
         """
         Обрабатывает ответ пользователя на уточняющие вопросы.
@@ -123,25 +189,25 @@ class MessageHandler:
             update: Обновление от Telegram
             context: Контекст бота
             user_message: Ответ пользователя
+            context_data: Сохраненный контекст уточнений пользователя
         """
         user_id = update.effective_user.id
-        context_data = self.clarification_context[user_id]
+        answer = user_message.strip().casefold()
         
         # Проверяем, ждем ли мы подтверждения удаления
         if context_data.get("waiting_delete_confirmation"):
-            user_message_lower = user_message.lower().strip()
-            if user_message_lower in ["да", "yes", "давай", "ок", "хорошо"]:
+            if answer in _YES_ANSWERS:
                 event_id = context_data.get("event_id")
                 if event_id:
-                    success = self.calendar_client.delete_event(event_id)
+                    success = await self.calendar_client.adelete_event(event_id)
                     if success:
                         await update.message.reply_text("✅ Событие удалено.")
                     else:
                         await update.message.reply_text("❌ Не удалось удалить событие.")
-                del self.clarification_context[user_id]
+                self.clarification_context.pop(user_id, None)
                 return
-            elif user_message_lower in ["нет", "no", "не", "неправильно"]:
-                del self.clarification_context[user_id]
+            elif answer in _NO_ANSWERS:
+                self.clarification_context.pop(user_id, None)
                 await update.message.reply_text(
                     "Хорошо, событие не будет удалено."
                 )
@@ -154,31 +220,17 @@ class MessageHandler:
         
         # Проверяем, ждем ли мы подтверждения
         if context_data.get("waiting_confirmation"):
-            user_message_lower = user_message.lower().strip()
-            if user_message_lower in ["да", "yes", "давай", "ок", "хорошо"]:
+            if answer in _YES_ANSWERS:
                 # Подтверждение получено, выполняем действие
-                slots = context_data["slots"]
-                intent = context_data["intent"]
+                confirmed_response = context_data["llm_response"]
                 
-                # Создаем временный LLMResponseModel для выполнения действия
-                from schema import SlotsModel, ClarifyModel
-                temp_response = LLMResponseModel(
-                    intent=intent,
-                    confidence=1.0,
-                    slots=SlotsModel(**slots),
-                    clarify=ClarifyModel(needed=False, questions=[])
-                )
+                self.clarification_context.pop(user_id, None)
                 
-                del self.clarification_context[user_id]
-                
-                if intent == "create":
-                    await self._handle_create(update, context, temp_response)
-                elif intent == "list":
-                    await self._handle_list(update, context, temp_response)
-                elif intent == "delete":
-                    await self._handle_delete(update, context, temp_response)
-            elif user_message_lower in ["нет", "no", "не", "неправильно"]:
-                del self.clarification_context[user_id]
+                handler = self._intent_handlers.get(confirmed_response.intent)
+                if handler is not None:
+                    await handler(update, context, confirmed_response)
+            elif answer in _NO_ANSWERS:
+                self.clarification_context.pop(user_id, None)
                 await update.message.reply_text(
                     "Понятно. Пожалуйста, переформулируйте ваш запрос более подробно."
                 )
@@ -201,7 +253,7 @@ class MessageHandler:
             # Все вопросы заданы, повторно отправляем в LLM с уточненными данными
             # Формируем новое сообщение с исходным запросом и ответами
             # (упрощенная реализация - можно улучшить)
-            del self.clarification_context[user_id]
+            self.clarification_context.pop(user_id, None)
             await update.message.reply_text(
                 "Спасибо за уточнения. Обрабатываю ваш запрос..."
             )
@@ -228,7 +280,7 @@ class MessageHandler:
             return
 
         # Создаем событие
-        event = self.calendar_client.create_event(
+        event = await self.calendar_client.acreate_event(
             title=slots.title,
             start_datetime=slots.start,
             end_datetime=slots.end,
@@ -239,27 +291,20 @@ class MessageHandler:
 
         if event:
             start_time = self._format_datetime_for_user(slots.start)
-            message = (
-                f"✅ Событие создано!\n\n"
-                f"📅 {slots.title}\n"
-                f"🕐 {start_time}"
-            )
             # Добавляем время окончания, если есть
             if slots.end:
-                end_time = self._format_datetime_for_user(slots.end)
-                message += f" — {end_time}\n"
-            else:
-                message += "\n"
+                start_time = f"{start_time} — {self._format_datetime_for_user(slots.end)}"
+            lines = ["✅ Событие создано!", "", f"📅 {slots.title}", f"🕐 {start_time}"]
 
             if slots.location:
-                message += f"📍 {slots.location}\n"
+                lines.append(f"📍 {slots.location}")
             if slots.participants:
-                message += f"👥 Участники: {', '.join(slots.participants)}\n"
-            message += f"\nID события: {event['id']}"
+                lines.append(f"👥 Участники: {', '.join(slots.participants)}")
+            lines += ["", f"ID события: {event['id']}"]
             if event.get('htmlLink'):
-                message += f"\n🔗 {event['htmlLink']}"
+                lines.append(f"🔗 {event['htmlLink']}")
 
-            await update.message.reply_text(message)
+            await update.message.reply_text("\n".join(lines))
         else:
             await update.message.reply_text(
                 "❌ Не удалось создать событие. Проверьте правильность данных и попробуйте снова."
@@ -281,7 +326,7 @@ class MessageHandler:
         elif slots.start:
             # Извлекаем дату из start
             try:
-                dt = datetime.fromisoformat(slots.start.replace("Z", "+00:00"))
+                dt = _parse_iso_datetime(slots.start)
                 target_date = dt.strftime("%Y-%m-%d")
             except:
                 pass
@@ -294,64 +339,60 @@ class MessageHandler:
             return
 
         # Получаем события
-        events = self.calendar_client.list_events(target_date)
+        events = await self.calendar_client.alist_events(target_date)
+        date_display = self._format_date_for_user(target_date)
 
         if not events:
             await update.message.reply_text(
-                f"📅 На {self._format_date_for_user(target_date)} нет запланированных событий."
+                f"📅 На {date_display} нет запланированных событий."
             )
             return
 
         # Формируем сообщение со списком событий
-        message = f"📅 События на {self._format_date_for_user(target_date)}:\n\n"
+        message = f"📅 События на {date_display}:\n\n" + "".join(
+            self._format_event_line(i, event) for i, event in enumerate(events, 1)
+        )
 
-        for i, event in enumerate(events, 1):
-            summary = event.get('summary', 'Без названия')
-            start = event.get('start', {})
-            end = event.get('end', {})
+        await update.message.reply_text(message)
+    
+    @staticmethod
+    def _format_event_line(index: int, event: dict) -> str:
+        """Формирует строку события для списка: номер, время, название и начало ID."""
+        summary = event.get('summary', 'Без названия')
+        start = event.get('start', {})
+        end = event.get('end', {})
 
-            # Вытащим строки (могут быть либо dateTime, либо date для all-day)
-            start_raw = start.get('dateTime') or start.get('date') or ''
-            end_raw = end.get('dateTime') or end.get('date') or ''
+        # Вытащим строки (могут быть либо dateTime, либо date для all-day)
+        start_dt = start.get('dateTime')
+        end_dt = end.get('dateTime')
+        start_raw = start_dt or start.get('date') or ''
+        end_raw = end_dt or end.get('date') or ''
 
-            # Форматируем для пользователя
-            if start.get('dateTime'):
+        # Форматируем для пользователя
+        if start_dt:
+            try:
+                start_str = _parse_iso_datetime(start_raw).strftime("%H:%M")
+            except ValueError:
+                start_str = start_raw
+            if end_dt:
                 try:
-                    dt_start = datetime.fromisoformat(start_raw.replace("Z", "+00:00"))
-                    start_str = dt_start.strftime("%H:%M")
-                except:
-                    start_str = start_raw
-                if end.get('dateTime'):
-                    try:
-                        dt_end = datetime.fromisoformat(end_raw.replace("Z", "+00:00"))
-                        end_str = dt_end.strftime("%H:%M")
-                    except:
-                        end_str = end_raw
-                    time_display = f"{start_str} — {end_str}"
-                else:
-                    time_display = start_str
+                    end_str = _parse_iso_datetime(end_raw).strftime("%H:%M")
+                except ValueError:
+                    end_str = end_raw
+                time_display = f"{start_str} — {end_str}"
             else:
-                # all-day event (date)
-                try:
-                    dt_start = datetime.strptime(start_raw, "%Y-%m-%d")
-                    start_str = dt_start.strftime("%d.%m.%Y")
-                except:
-                    start_str = start_raw
-                if end_raw:
-                    try:
-                        dt_end = datetime.strptime(end_raw, "%Y-%m-%d")
-                        # Обычно end в Google Calendar — день после последнего дня включительно, оставим как есть
-                        end_str = dt_end.strftime("%d.%m.%Y")
-                        time_display = f"{start_str} — {end_str} (весь день)"
-                    except:
-                        time_display = f"{start_str} — {end_raw} (весь день)"
-                else:
-                    time_display = f"{start_str} (весь день)"
-
-            event_id = event.get('id', '')
-            message += f"{i}. 🕐 {time_display} — {summary}\n   ID: {event_id[:8]}...\n\n"
+                time_display = start_str
+        else:
+            # all-day event (date); строки, которые не удалось разобрать, выводятся как есть
+            start_str = _format_date_for_user(start_raw)
+            if end_raw:
+                # Обычно end в Google Calendar — день после последнего дня включительно, оставим как есть
+                time_display = f"{start_str} — {_format_date_for_user(end_raw)} (весь день)"
+            else:
+                time_display = f"{start_str} (весь день)"
 
-        await update.message.reply_text(message)
+        event_id = event.get('id', '')
+        return f"{index}. 🕐 {time_display} — {summary}\n   ID: {event_id[:8]}...\n\n"
     
     async def _handle_delete(
         self,
@@ -364,7 +405,7 @@ class MessageHandler:
         
         # Если указан event_id, удаляем напрямую
         if slots.event_id:
-            success = self.calendar_client.delete_event(slots.event_id)
+            success = await self.calendar_client.adelete_event(slots.event_id)
             if success:
                 await update.message.reply_text("✅ Событие удалено.")
             else:
@@ -385,7 +426,7 @@ class MessageHandler:
             target_date = slots.date
         elif slots.start:
             try:
-                dt = datetime.fromisoformat(slots.start.replace("Z", "+00:00"))
+                dt = _parse_iso_datetime(slots.start)
                 target_date = dt.strftime("%Y-%m-%d")
             except:
                 pass
@@ -395,7 +436,7 @@ class MessageHandler:
             target_date = datetime.now().strftime("%Y-%m-%d")
         
         # Ищем события
-        matching_events = self.calendar_client.find_events_by_title_and_date(
+        matching_events = await self.calendar_client.afind_events_by_title_and_date(
             slots.title, target_date
         )
         
@@ -413,10 +454,7 @@ class MessageHandler:
             start = event.get('start', {})
             start_time = start.get('dateTime', start.get('date', ''))
             
-            message = (
-                f"Найдено событие:\n\n"
-                f"📅 {summary}\n"
-            )
+            lines = ["Найдено событие:", "", f"📅 {summary}"]
 
             # Получаем и форматируем время начала и окончания
             end = event.get('end', {})
@@ -424,21 +462,21 @@ class MessageHandler:
 
             if start_time:
                 try:
-                    dt_start = datetime.fromisoformat(start_time.replace("Z", "+00:00"))
+                    dt_start = _parse_iso_datetime(start_time)
                     start_fmt = dt_start.strftime('%Y-%m-%d %H:%M')
                 except:
                     start_fmt = start_time
                 if end_time:
                     try:
-                        dt_end = datetime.fromisoformat(end_time.replace("Z", "+00:00"))
+                        dt_end = _parse_iso_datetime(end_time)
                         end_fmt = dt_end.strftime('%Y-%m-%d %H:%M')
                     except:
                         end_fmt = end_time
-                    message += f"🕐 {start_fmt} — {end_fmt}\n"
+                    lines.append(f"🕐 {start_fmt} — {end_fmt}")
                 else:
-                    message += f"🕐 {start_fmt}\n"
+                    lines.append(f"🕐 {start_fmt}")
             
-            message += "\nУдалить это событие? (Да / Нет)"
+            lines += ["", "Удалить это событие? (Да / Нет)"]
             
             # Сохраняем контекст для подтверждения
             user_id = update.effective_user.id
@@ -447,27 +485,21 @@ class MessageHandler:
                 "event_id": event_id
             }
             
-            await update.message.reply_text(message)
+            await update.message.reply_text("\n".join(lines))
         else:
             # Несколько событий - показываем список
-            message = f"Найдено несколько событий с названием '{slots.title}':\n\n"
-            for i, event in enumerate(matching_events, 1):
-                summary = event.get('summary', 'Без названия')
-                event_id = event.get('id')
-                message += f"{i}. {summary} (ID: {event_id[:8]}...)\n"
-            message += "\nПожалуйста, укажите ID события для удаления."
+            lines = [f"Найдено несколько событий с названием '{slots.title}':", ""]
+            lines.extend(
+                f"{i}. {event.get('summary', 'Без названия')} (ID: {event.get('id')[:8]}...)"
+                for i, event in enumerate(matching_events, 1)
+            )
+            lines += ["", "Пожалуйста, укажите ID события для удаления."]
             
-            await update.message.reply_text(message)
+            await update.message.reply_text("\n".join(lines))
     
     def _format_confirmation(self, llm_response: LLMResponseModel) -> str:
         """Форматирует текст подтверждения для пользователя."""
-        intent_map = {
-            "create": "создать событие",
-            "list": "показать события",
-            "delete": "удалить событие"
-        }
-        
-        action = intent_map.get(llm_response.intent, "выполнить действие")
+        action = _INTENT_ACTIONS.get(llm_response.intent, "выполнить действие")
         slots = llm_response.slots
         
         parts = [f"Я правильно понял, что нужно {action}?"]
@@ -487,19 +519,11 @@ class MessageHandler:
     
     def _format_datetime_for_user(self, dt_str: str) -> str:
         """Форматирует дату/время для отображения пользователю."""
-        try:
-            dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-            return dt.strftime("%d.%m.%Y %H:%M")
-        except:
-            return dt_str
+        return _format_datetime_for_user(dt_str)
     
     def _format_date_for_user(self, date_str: str) -> str:
         """Форматирует дату для отображения пользователю."""
-        try:
-            dt = datetime.strptime(date_str, "%Y-%m-%d")
-            return dt.strftime("%d.%m.%Y")
-        except:
-            return date_str
+        return _format_date_for_user(date_str)
     
     async def handle_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Обработчик команды /start."""
@@ -516,7 +540,7 @@ class MessageHandler:
     async def handle_add(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Обработчик команды /add."""
         # Извлекаем текст после команды
-        command_text = update.message.text.replace("/add", "").strip()
+        command_text = update.message.text.removeprefix("/add").strip()
         if not command_text:
             await update.message.reply_text(
                 "Использование: /add <текст>\n"
@@ -530,7 +554,7 @@ class MessageHandler:
     async def handle_view(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Обработчик команды /view."""
         # Извлекаем дату
-        command_text = update.message.text.replace("/view", "").strip()
+        command_text = update.message.text.removeprefix("/view").strip()
         if not command_text:
             await update.message.reply_text(
                 "Использование: /view YYYY-MM-DD\n"
@@ -545,7 +569,7 @@ class MessageHandler:
     async def handle_delete_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Обработчик команды /delete."""
         # Извлекаем идентификатор
-        command_text = update.message.text.replace("/delete", "").strip()
+        command_text = update.message.text.removeprefix("/delete").strip()
         if not command_text:
             await update.message.reply_text(
                 "Использование: /delete <event_id|название>\n"
@@ -556,7 +580,7 @@ class MessageHandler:
         # Если это похоже на event_id (короткая строка), используем напрямую
         if len(command_text) < 50 and not " " in command_text:
             # Пытаемся удалить по ID
-            success = self.calendar_client.delete_event(command_text)
+            success = await self.calendar_client.adelete_event(command_text)
             if success:
                 await update.message.reply_text("✅ Событие удалено.")
             else:
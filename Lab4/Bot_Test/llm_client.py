@@ -1,22 +1,100 @@
 """Клиент для работы с LLM через Open Router API."""
+import asyncio
 import json
 import logging
-from typing import Optional
+import random
+import re
+import time
+from collections import OrderedDict, deque
+from datetime import date
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
-import requests
-from config import Config
+import httpx
+from pydantic import ValidationError
+from config import config
 from schema import LLMResponseModel
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+# Ответ LLM может быть обернут в блок кода ```json ... ```
+_CODE_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+_JSON_DECODER = json.JSONDecoder()
+
+# Таймаут запроса к LLM (секунды)
+LLM_REQUEST_TIMEOUT = 30
+
+# Повтор запросов при временных ошибках Open Router (экспоненциальная задержка)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+LLM_RETRIES = 3
+LLM_RETRY_BACKOFF_SEC = 0.5
+
+# Размыкатель цепи: если среди последних запросов больше половины завершились
+# ошибкой, запросы к LLM не отправляются в течение паузы
+BREAKER_WINDOW = 20
+BREAKER_MIN_CALLS = 5
+BREAKER_FAILURE_RATIO = 0.5
+BREAKER_COOLDOWN_SEC = 30.0
+
+# Сообщения с относительным временем ("через час", "сейчас") не кэшируем:
+# ответ на них зависит от момента отправки, а не только от даты
+_RELATIVE_TIME_RE = re.compile(r"\b(?:через|сейчас|скоро|позже)\b", re.IGNORECASE)
+
+# Для ключа кэша: знаки препинания и повторные пробелы не меняют смысл запроса
+_CACHE_PUNCT_RE = re.compile(r"[^\w\s:.@-]+|[.:](?!\w)")
+_CACHE_SPACES_RE = re.compile(r"\s+")
+
+
+def _cache_key_text(message: str) -> str:
+    """Нормализует сообщение для ключа кэша: регистр, ё/е, пунктуация, пробелы."""
+    text = message.casefold().replace("ё", "е")
+    text = _CACHE_PUNCT_RE.sub(" ", text)
+    return _CACHE_SPACES_RE.sub(" ", text).strip()
+
 
 class LLMClient:
     """Клиент для взаимодействия с LLM через Open Router."""
     
     def __init__(self):
-        self.api_key = Config.OPENROUTER_API_KEY
-        self.api_url = Config.OPENROUTER_API_URL
-        self.model = Config.LLM_MODEL
+        self.api_key = config.OPENROUTER_API_KEY
+        self.api_url = config.OPENROUTER_API_URL
+        self.model = config.LLM_MODEL
+        self.cache_enabled = config.LLM_CACHE_ENABLED and config.LLM_CACHE_SIZE > 0
+        self.cache_size = config.LLM_CACHE_SIZE
+        # LRU-кэш: (модель, дата, нормализованное сообщение) -> провалидированный ответ
+        self._exact_cache: "OrderedDict[Tuple[str, str, str], LLMResponseModel]" = OrderedDict()
+        # Системный промпт и примеры не меняются: собираем их один раз
+        self._prompt_messages = self._build_prompt_messages(self._load_prompt_template())
+        # Результаты последних запросов к Open Router (True - успех) и момент,
+        # до которого размыкатель цепи не пропускает запросы
+        self._call_results: deque = deque(maxlen=BREAKER_WINDOW)
+        self._breaker_open_until = 0.0
+        # Выполняющиеся запросы к LLM: ключ сообщения -> Future с ответом
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        # Общий асинхронный клиент: соединение с Open Router переиспользуется (keep-alive)
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=LLM_REQUEST_TIMEOUT,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "HTTP-Referer": "https://github.com/your-repo",
+                "X-Title": "Telegram Calendar Bot"
+            }
+        )
         
     def _load_prompt_template(self) -> dict:
         """Загружает шаблон промпта из файла."""
@@ -33,6 +111,24 @@ class LLMClient:
             logger.error(f"Ошибка загрузки промпта: {e}, используем дефолтный")
             return self._get_default_prompt()
     
+    def _build_prompt_messages(self, prompt_data: dict) -> List[Dict[str, str]]:
+        """Формирует неизменную часть сообщений: системный промпт и примеры."""
+        messages = [
+            {"role": "system", "content": prompt_data.get("system", "")}
+        ]
+        
+        # Добавляем примеры
+        for example in prompt_data.get("examples", [])[:3]:  # Берем первые 3 примера
+            messages.append({
+                "role": "user",
+                "content": example.get("user", "")
+            })
+            messages.append({
+                "role": "assistant",
+                "content": json.dumps(example.get("response", {}), ensure_ascii=False)
+            })
+        return messages
+    
     def _get_default_prompt(self) -> dict:
         """Возвращает дефолтный промпт, если файл не найден."""
         return {
@@ -84,7 +180,11 @@ class LLMClient:
             ]
         }
     
-    def parse_user_message(self, user_message: str) -> Optional[LLMResponseModel]:
+    async def aclose(self) -> None:
+        """Закрывает HTTP-соединения с Open Router."""
+        await self._client.aclose()
+    
+    async def parse_user_message(self, user_message: str) -> Optional[LLMResponseModel]:
         """
         Отправляет сообщение пользователя в LLM и возвращает распарсенный ответ.
         
@@ -94,41 +194,53 @@ class LLMClient:
         Returns:
             LLMResponseModel или None в случае ошибки
         """
+        # Повторная фраза за тот же день отдается из кэша без запроса к LLM.
+        # Дата входит в ключ, т.к. "сегодня"/"завтра" LLM превращает в конкретные даты
+        key = (self.model, date.today().isoformat(), _cache_key_text(user_message))
+        cacheable = self.cache_enabled and not _RELATIVE_TIME_RE.search(user_message)
+        if cacheable:
+            cached = self._exact_cache.get(key)
+            if cached is not None:
+                self._exact_cache.move_to_end(key)
+                logger.info(f"Ответ LLM взят из кэша для сообщения: {user_message[:50]}...")
+                return cached
+        
+        if self._breaker_is_open():
+            logger.warning("Open Router недоступен, запрос к LLM пропущен (размыкатель цепи)")
+            return None
+        
+        # Такой же запрос уже выполняется - ждем его результат вместо нового вызова API.
+        # shield: отмена ожидающего обработчика не должна отменять общий запрос
+        pending = self._inflight.get(key)
+        if pending is not None:
+            logger.info(f"Ожидание уже отправленного запроса к LLM: {user_message[:50]}...")
+            return await asyncio.shield(pending)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
         try:
-            prompt_data = self._load_prompt_template()
-            system_prompt = prompt_data.get("system", "")
-            examples = prompt_data.get("examples", [])
-            
-            # Формируем промпт с примерами
-            messages = [
-                {"role": "system", "content": system_prompt}
+            llm_response = await self._request_llm(user_message)
+            future.set_result(llm_response)
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                # Запрос отменен: ожидающие получают None, как при ошибке
+                future.set_result(None)
+        
+        if cacheable and llm_response is not None:
+            self._exact_cache[key] = llm_response
+            if len(self._exact_cache) > self.cache_size:
+                self._exact_cache.popitem(last=False)
+        return llm_response
+    
+    async def _request_llm(self, user_message: str) -> Optional[LLMResponseModel]:
+        """Запрашивает LLM и валидирует ответ; None в случае ошибки."""
+        try:
+            # Промпт с примерами + текущий запрос пользователя
+            messages = self._prompt_messages + [
+                {"role": "user", "content": user_message}
             ]
             
-            # Добавляем примеры
-            for example in examples[:3]:  # Берем первые 3 примера
-                messages.append({
-                    "role": "user",
-                    "content": example.get("user", "")
-                })
-                messages.append({
-                    "role": "assistant",
-                    "content": json.dumps(example.get("response", {}), ensure_ascii=False)
-                })
-            
-            # Добавляем текущий запрос пользователя
-            messages.append({
-                "role": "user",
-                "content": user_message
-            })
-            
-            # Отправляем запрос в Open Router
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://github.com/your-repo",
-                "X-Title": "Telegram Calendar Bot"
-            }
-            
             payload = {
                 "model": self.model,
                 "messages": messages,
@@ -143,103 +255,115 @@ class LLMClient:
                 pass
             
             logger.info(f"Отправка запроса в LLM для сообщения: {user_message[:50]}...")
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
+            # Отправляем запрос в Open Router, не блокируя цикл событий
+            try:
+                response = await self._post_with_retry(_json_dumps(payload))
+            except httpx.HTTPError:
+                self._record_call(False)
+                raise
+            self._record_call(True)
             
-            result = response.json()
+            result = _json_loads(response.content)
             content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
             
             if not content:
                 logger.error("Пустой ответ от LLM")
                 return None
             
-            # Пытаемся извлечь JSON из ответа
-            json_str = self._extract_json(content)
-            if not json_str:
-                logger.error(f"Не удалось извлечь JSON из ответа: {content}")
-                return None
-            
-            # Парсим и валидируем через Pydantic
-            parsed_data = json.loads(json_str)
-            llm_response = LLMResponseModel(**parsed_data)
+            # Обычно ответ - чистый JSON (response_format=json_object): pydantic-core
+            # разбирает и валидирует его за один проход без промежуточного dict
+            try:
+                llm_response = LLMResponseModel.model_validate_json(content)
+            except ValidationError as e:
+                if e.errors()[0]["type"] != "json_invalid":
+                    raise
+                # JSON окружен текстом или блоком кода - извлекаем его
+                parsed_data = self._extract_json_obj(content)
+                if parsed_data is None:
+                    logger.error(f"Не удалось извлечь JSON из ответа: {content}")
+                    return None
+                llm_response = LLMResponseModel.model_validate(parsed_data)
             
             logger.info(f"Успешно распознано намерение: {llm_response.intent}, confidence: {llm_response.confidence}")
             return llm_response
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Ошибка запроса к LLM API: {e}")
             return None
-        except json.JSONDecodeError as e:
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError - его подкласс
             logger.error(f"Ошибка парсинга JSON от LLM: {e}")
             return None
         except Exception as e:
             logger.error(f"Неожиданная ошибка при работе с LLM: {e}")
             return None
     
-    def _extract_json(self, text: str) -> Optional[str]:
+    async def _post_with_retry(self, body: bytes) -> httpx.Response:
+        """
+        Отправляет запрос в Open Router.
+        
+        При ответах 429/5xx и ошибках соединения запрос повторяется с экспоненциальной
+        задержкой и случайным разбросом; остальные ошибки пробрасываются сразу.
+        """
+        for attempt in range(LLM_RETRIES):
+            try:
+                response = await self._client.post(self.api_url, content=body)
+                response.raise_for_status()
+                return response
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in RETRY_STATUSES or attempt == LLM_RETRIES - 1:
+                    raise
+                reason = e.response.status_code
+            except httpx.ConnectError as e:
+                if attempt == LLM_RETRIES - 1:
+                    raise
+                reason = e
+            delay = LLM_RETRY_BACKOFF_SEC * 2 ** attempt + random.random() * 0.1
+            logger.warning(f"Временная ошибка Open Router ({reason}), повтор через {delay:.2f} с")
+            await asyncio.sleep(delay)
+    
+    def _record_call(self, ok: bool) -> None:
+        """Запоминает результат запроса и размыкает цепь при большой доле ошибок."""
+        self._call_results.append(ok)
+        calls = len(self._call_results)
+        failures = calls - sum(self._call_results)
+        if calls >= BREAKER_MIN_CALLS and failures / calls > BREAKER_FAILURE_RATIO:
+            self._breaker_open_until = time.monotonic() + BREAKER_COOLDOWN_SEC
+            self._call_results.clear()
+            logger.error(
+                f"Open Router: {failures} ошибок из {calls} запросов, "
+                f"запросы приостановлены на {BREAKER_COOLDOWN_SEC:.0f} с"
+            )
+    
+    def _breaker_is_open(self) -> bool:
+        """True, если после серии ошибок еще не истекла пауза перед новыми запросами."""
+        return time.monotonic() < self._breaker_open_until
+    
+    def _extract_json_obj(self, text: str) -> Optional[dict]:
         """
-        Извлекает JSON из текста ответа LLM.
+        Извлекает JSON-объект из текста ответа LLM.
+        
+        Объект ищется в начале текста, затем внутри блоков ```json ... ``` и,
+        наконец, с первой открывающей скобки. raw_decode разбирает объект и
+        находит его конец за один проход, поэтому повторный json.loads не нужен.
         
         Args:
             text: Текст ответа от LLM
             
         Returns:
-            JSON строка или None
+            Распарсенный словарь или None
         """
-        # Пытаемся найти JSON в тексте
         text = text.strip()
+        candidates = [text]
+        candidates.extend(block.strip() for block in _CODE_FENCE_RE.findall(text))
         
-        # Если текст начинается с {, пытаемся найти закрывающую скобку
-        if text.startswith("{"):
+        for candidate in candidates:
+            start = candidate.find("{")
+            if start < 0:
+                continue
             try:
-                # Находим последнюю закрывающую скобку
-                brace_count = 0
-                end_idx = -1
-                for i, char in enumerate(text):
-                    if char == "{":
-                        brace_count += 1
-                    elif char == "}":
-                        brace_count -= 1
-                        if brace_count == 0:
-                            end_idx = i
-                            break
-                
-                if end_idx > 0:
-                    json_str = text[:end_idx + 1]
-                    # Проверяем, что это валидный JSON
-                    json.loads(json_str)
-                    return json_str
-            except:
-                pass
-        
-        # Если не получилось, пытаемся найти JSON между ```json и ```
-        if "```json" in text:
-            start = text.find("```json") + 7
-            end = text.find("```", start)
-            if end > start:
-                return text[start:end].strip()
-        
-        # Если не получилось, пытаемся найти JSON между ``` и ```
-        if "```" in text:
-            parts = text.split("```")
-            for part in parts:
-                part = part.strip()
-                if part.startswith("{") and part.endswith("}"):
-                    try:
-                        json.loads(part)
-                        return part
-                    except:
-                        continue
-        
-        # Последняя попытка - весь текст
-        try:
-            json.loads(text)
-            return text
-        except:
-            return None
-
+                obj, _ = _JSON_DECODER.raw_decode(candidate, start)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(obj, dict):
+                return obj
+        return None
@@ -1,83 +1,143 @@
 """Точка входа приложения - запуск Telegram-бота."""
 import logging
 import asyncio
+import sys
+from typing import Set
 from telegram import Update
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 from telegram.error import InvalidToken
 
-from config import Config
+from config import config
 from handlers import MessageHandler as BotMessageHandler
 
-# Настройка логирования
+# Настройка логирования (неизвестный LOG_LEVEL - INFO)
+_LOG_LEVEL = getattr(logging, config.LOG_LEVEL.upper(), logging.INFO)
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=getattr(logging, Config.LOG_LEVEL.upper())
+    level=_LOG_LEVEL,
+    stream=sys.stdout
 )
 logger = logging.getLogger(__name__)
 
+try:
+    # uvloop (libuv) быстрее стандартного цикла событий; на Windows недоступен
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Команды бота: команда -> метод BotMessageHandler
+COMMAND_HANDLERS = (
+    ("start", "handle_start"),
+    ("add", "handle_add"),
+    ("view", "handle_view"),
+    ("delete", "handle_delete_command"),
+)
+
+# Окно, в котором повторные ошибки в чате объединяются в один ответ пользователю
+ERROR_REPLY_WINDOW_SEC = 0.1
+
+# Чаты, для которых ответ об ошибке уже запланирован
+_pending_error_replies: Set[int] = set()
+
 
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик ошибок."""
-    logger.error(f"Ошибка при обработке обновления: {context.error}", exc_info=context.error)
+    logger.error("Ошибка при обработке обновления: %s", context.error, exc_info=context.error)
     
     if update and update.effective_message:
-        await update.effective_message.reply_text(
-            "Произошла ошибка при обработке вашего запроса. Попробуйте позже."
-        )
+        chat_id = update.effective_message.chat_id
+        # За окно ERROR_REPLY_WINDOW_SEC серия ошибок в одном чате дает один ответ
+        if chat_id in _pending_error_replies:
+            return
+        _pending_error_replies.add(chat_id)
+        try:
+            await asyncio.sleep(ERROR_REPLY_WINDOW_SEC)
+            await update.effective_message.reply_text(
+                "Произошла ошибка при обработке вашего запроса. Попробуйте позже."
+            )
+        finally:
+            _pending_error_replies.discard(chat_id)
 
 
 def main():
     """Основная функция запуска бота."""
     # Валидация конфигурации
     try:
-        Config.validate()
+        config.validate()
     except (ValueError, FileNotFoundError) as e:
-        logger.error(f"Ошибка конфигурации: {e}")
-        print(f"\n❌ Ошибка конфигурации: {e}\n")
-        print("Пожалуйста, проверьте:")
-        print("1. Существует ли файл .env с необходимыми переменными")
-        print("2. Существует ли файл credentials.json")
-        print("3. См. README.md для подробных инструкций")
+        logger.error(
+            "❌ Ошибка конфигурации: %s\n"
+            "Пожалуйста, проверьте:\n"
+            "1. Существует ли файл .env с необходимыми переменными\n"
+            "2. Существует ли файл credentials.json\n"
+            "3. См. README.md для подробных инструкций",
+            e
+        )
         return
     
-    # Создаем приложение
-    application = Application.builder().token(Config.TELEGRAM_TOKEN).build()
+    if uvloop is not None:
+        # run_polling создает цикл событий через текущую политику
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Используется цикл событий uvloop")
     
     # Создаем обработчик сообщений
     bot_message_handler = BotMessageHandler()
     
-    # Регистрируем обработчики команд
-    application.add_handler(CommandHandler("start", bot_message_handler.handle_start))
-    application.add_handler(CommandHandler("add", bot_message_handler.handle_add))
-    application.add_handler(CommandHandler("view", bot_message_handler.handle_view))
-    application.add_handler(CommandHandler("delete", bot_message_handler.handle_delete_command))
+    async def close_clients(application: Application) -> None:
+        """Закрывает HTTP-соединения клиентов при остановке бота."""
+        await bot_message_handler.llm_client.aclose()
+    
+    # Создаем приложение
+    application = (
+        Application.builder()
+        .token(config.TELEGRAM_TOKEN)
+        # По HTTP/2 запросы к Bot API мультиплексируются в одном соединении (TELEGRAM_HTTP2=1);
+        # long polling getUpdates всегда идет по HTTP/1.1 - с HTTP/2 он менее стабилен
+        .http_version("2" if config.TELEGRAM_HTTP2 else "1.1")
+        .get_updates_http_version("1.1")
+        # Обновления разных пользователей обрабатываются параллельно:
+        # медленный ответ LLM одному пользователю не задерживает остальных
+        .concurrent_updates(max(config.CONCURRENT_UPDATES, 1))
+        .post_shutdown(close_clients)
+        .build()
+    )
     
-    # Регистрируем обработчик текстовых сообщений
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, callback=bot_message_handler.handle_message))
+    # Регистрируем обработчики команд и текстовых сообщений одним вызовом
+    application.add_handlers([
+        *(CommandHandler(command, getattr(bot_message_handler, method))
+          for command, method in COMMAND_HANDLERS),
+        MessageHandler(filters.TEXT & ~filters.COMMAND, callback=bot_message_handler.handle_message),
+    ])
     
     # Регистрируем обработчик ошибок
     application.add_error_handler(error_handler)
     
     # Запускаем бота
-    logger.info("Запуск Telegram-бота...")
-    print("\n✅ Бот запущен! Нажмите Ctrl+C для остановки.\n")
+    logger.info("✅ Бот запущен! Нажмите Ctrl+C для остановки.")
     
     try:
-        application.run_polling(allowed_updates=Update.ALL_TYPES)
+        # Long polling: Telegram держит getUpdates открытым до появления обновления,
+        # вместо частых пустых запросов; при сетевых сбоях на старте - повторяем
+        application.run_polling(
+            allowed_updates=Update.ALL_TYPES,
+            timeout=config.POLLING_TIMEOUT_SEC,
+            poll_interval=0.0,
+            bootstrap_retries=-1
+        )
     except KeyboardInterrupt:
-        logger.info("Остановка бота по запросу пользователя")
-        print("\n👋 Бот остановлен.\n")
+        logger.info("👋 Бот остановлен по запросу пользователя")
     except InvalidToken as e:
-        logger.error(f"Ошибка токена Telegram: {e}")
-        print(f"\n❌ Ошибка токена Telegram: {e}\n")
-        print("Пожалуйста, проверьте:")
-        print("1. Файл .env существует и содержит правильный TELEGRAM_TOKEN")
-        print("2. Токен получен от @BotFather в Telegram")
-        print("3. Токен не содержит лишних пробелов или символов")
-        print("\nСм. README.md для подробных инструкций по настройке.")
+        logger.error(
+            "❌ Ошибка токена Telegram: %s\n"
+            "Пожалуйста, проверьте:\n"
+            "1. Файл .env существует и содержит правильный TELEGRAM_TOKEN\n"
+            "2. Токен получен от @BotFather в Telegram\n"
+            "3. Токен не содержит лишних пробелов или символов\n"
+            "См. README.md для подробных инструкций по настройке.",
+            e
+        )
     except Exception as e:
-        logger.error(f"Критическая ошибка: {e}", exc_info=True)
-        print(f"\n❌ Критическая ошибка: {e}\n")
+        logger.error("❌ Критическая ошибка: %s", e, exc_info=True)
 
 
 if __name__ == "__main__":
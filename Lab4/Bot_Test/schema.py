@@ -1,17 +1,46 @@
 """Pydantic-схемы для валидации JSON-ответов от LLM."""
 from typing import Optional, List, Literal
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime
+from functools import lru_cache
+import sys
+
+# Ответы LLM кэшируются и разделяются между обработчиками, поэтому модели неизменяемы
+_FROZEN_CONFIG = ConfigDict(frozen=True, extra="ignore")
+
+if sys.version_info >= (3, 11):
+    # С Python 3.11 fromisoformat сам понимает суффикс Z
+    _fromisoformat = datetime.fromisoformat
+else:
+    def _fromisoformat(value: str) -> datetime:
+        """fromisoformat с поддержкой суффикса Z для Python < 3.11."""
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value)
+
+
+@lru_cache(maxsize=512)
+def _is_iso_datetime(value: str) -> bool:
+    """Проверяет формат ISO8601 (результат кэшируется: LLM повторяет одни и те же даты)."""
+    try:
+        _fromisoformat(value)
+    except ValueError:
+        return False
+    return True
 
 
 class ClarifyModel(BaseModel):
     """Модель для уточняющих вопросов."""
+    model_config = _FROZEN_CONFIG
+    
     needed: bool = Field(default=False, description="Нужно ли уточнение")
     questions: List[str] = Field(default_factory=list, description="Список уточняющих вопросов")
 
 
 class SlotsModel(BaseModel):
     """Модель для слотов (параметров) намерения."""
+    model_config = _FROZEN_CONFIG
+    
     title: Optional[str] = Field(default=None, description="Название события")
     start: Optional[str] = Field(default=None, description="Дата и время начала в ISO8601 с часовым поясом")
     end: Optional[str] = Field(default=None, description="Дата и время окончания в ISO8601 с часовым поясом")
@@ -27,18 +56,16 @@ class SlotsModel(BaseModel):
         """Валидация формата даты/времени."""
         if v is None:
             return v
-        if isinstance(v, str):
-            try:
-                # Проверяем, что это валидный ISO8601 формат
-                datetime.fromisoformat(v.replace("Z", "+00:00"))
-                return v
-            except ValueError:
-                raise ValueError(f"Неверный формат даты/времени: {v}")
+        # Проверяем, что это валидный ISO8601 формат
+        if isinstance(v, str) and not _is_iso_datetime(v):
+            raise ValueError(f"Неверный формат даты/времени: {v}")
         return v
 
 
 class LLMResponseModel(BaseModel):
     """Модель для ответа от LLM."""
+    model_config = _FROZEN_CONFIG
+    
     intent: Literal["create", "list", "delete", "unknown"] = Field(
         description="Намерение пользователя"
     )
@@ -48,12 +75,3 @@ class LLMResponseModel(BaseModel):
     )
     slots: SlotsModel = Field(default_factory=SlotsModel, description="Параметры намерения")
     clarify: ClarifyModel = Field(default_factory=ClarifyModel, description="Уточняющие вопросы")
-    
-    @field_validator("confidence")
-    @classmethod
-    def validate_confidence(cls, v):
-        """Валидация confidence."""
-        if not isinstance(v, (int, float)):
-            raise ValueError("confidence должен быть числом")
-        return float(v)
-